@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+# This file is part of dax_apdb_deploy.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Offline benchmark of clone-keyspace dump and load pipelines.
+
+Cassandra is not needed: `dsbulk` is replaced on ``$PATH`` by
+``fake_dsbulk.py``, which generates deterministic synthetic CSV data for
+``unload`` and consumes data for ``load``, optionally at a limited rate.
+Cluster metadata
+queries are answered by an in-process stand-in for the driver session.
+Everything else (compression, checksums, bundling, scheduling) is the real
+clone-keyspace code, so the results measure its overhead. Only the
+"dsbulk" engine is supported.
+
+For each combination of options the benchmark reports wall time, rates of
+rows and CSV data, stored size, and CPU time used by the clone-keyspace
+process itself (pipeline, checksums, bundling), by fake dsbulk processes,
+and by compression tools.
+
+Example::
+
+    python benchmarks/clone_keyspace_bench.py --tables 8 --rows 500000 \
+        --jobs 1 4 --codec gzip zstd --bundle none tar
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from typing import Any
+from unittest import mock
+
+import fake_dsbulk
+from prettytable import PrettyTable
+
+from lsst.dax.apdb_deploy.scripts import _clone_keyspace
+
+_KEYSPACE = "bench"
+
+
+class _Result(list):
+    """Query result of the stand-in session."""
+
+    def one(self) -> Any:
+        return self[0]
+
+
+class _Row(tuple):
+    """Row of DESCRIBE result."""
+
+    create_statement: str
+
+
+class _ResponseFuture:
+    """Stand-in for the driver response future, which is already done."""
+
+    def __init__(self, rows: list):
+        self._rows = rows
+
+    def add_callbacks(self, callback: Callable[[Any], None], errback: Callable[[Exception], None]) -> None:
+        callback(self._rows)
+
+
+class _ControlConnection:
+    """Stand-in for the driver control connection."""
+
+    def wait_for_schema_agreement(self, wait_time: float | None = None) -> bool:
+        return True
+
+
+class _Metadata:
+    """Stand-in for the driver cluster metadata."""
+
+    partitioner = "org.apache.cassandra.dht.Murmur3Partitioner"
+
+
+class _Session:
+    """Stand-in for the driver session which answers metadata queries about
+    synthetic tables.
+    """
+
+    def __init__(self, cluster: _Cluster):
+        self.cluster = cluster
+
+    def __enter__(self) -> _Session:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+    def execute(self, query: str, parameters: Any = None, timeout: float | None = None) -> _Result:
+        types = fake_dsbulk.column_types(self.cluster.n_columns)
+        if "system_schema.keyspaces" in query:
+            return _Result([(_KEYSPACE,)])
+        if "system_schema.tables" in query:
+            return _Result([(table,) for table in self.cluster.existing_tables])
+        if "system_schema.columns" in query and "type FROM" in query:
+            return _Result(
+                [(table, name, cql_type) for table in self.cluster.tables for name, cql_type in types.items()]
+            )
+        if "system_schema.columns" in query:
+            return _Result(
+                [
+                    (table, name, "partition_key" if name == "id" else "regular", 0 if name == "id" else -1)
+                    for table in self.cluster.tables
+                    for name in types
+                ]
+            )
+        if "size_estimates" in query:
+            # Single range covering the whole ring.
+            return _Result(
+                [
+                    (table, str(-(2**63)), str(2**63 - 1), self.cluster.table_size, 1)
+                    for table in self.cluster.tables
+                ]
+            )
+        if query.startswith("DESCRIBE"):
+            table = query.split(".")[1].strip('"')
+            columns = ", ".join(f"{name} {cql_type}" for name, cql_type in types.items())
+            row = _Row(())
+            row.create_statement = f"CREATE TABLE {_KEYSPACE}.{table} ({columns}, PRIMARY KEY (id))"
+            return _Result([row])
+        return _Result([])
+
+    def execute_async(self, query: str, timeout: float | None = None) -> _ResponseFuture:
+        return _ResponseFuture(self.execute(query))
+
+
+class _Cluster:
+    """Stand-in for the driver cluster with synthetic tables."""
+
+    def __init__(self, tables: list[str], existing_tables: list[str], n_columns: int, table_size: int):
+        self.tables = tables
+        self.existing_tables = existing_tables
+        self.n_columns = n_columns
+        self.table_size = table_size
+        self.metadata = _Metadata()
+        self.control_connection = _ControlConnection()
+
+    def __enter__(self) -> _Cluster:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+    def connect(self) -> _Session:
+        return _Session(self)
+
+
+class _Usage:
+    """CPU time of this process and of its children, and the records of
+    fake dsbulk processes.
+    """
+
+    def __init__(self, dsbulk_log: str):
+        self._dsbulk_log = dsbulk_log
+        self._start = time.monotonic()
+        self._self = resource.getrusage(resource.RUSAGE_SELF)
+        self._children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        with open(dsbulk_log, "w"):
+            pass
+
+    def result(self) -> dict[str, float]:
+        wall = time.monotonic() - self._start
+        usage_self = resource.getrusage(resource.RUSAGE_SELF)
+        usage_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        with open(self._dsbulk_log) as log:
+            records = [json.loads(line) for line in log]
+        cpu_dsbulk = sum(record["cpu"] for record in records)
+        cpu_children = (usage_children.ru_utime + usage_children.ru_stime) - (
+            self._children.ru_utime + self._children.ru_stime
+        )
+        return {
+            "wall": wall,
+            "rows": sum(record["rows"] for record in records),
+            "size": sum(record["size"] for record in records),
+            "cpu_process": (usage_self.ru_utime + usage_self.ru_stime)
+            - (self._self.ru_utime + self._self.ru_stime),
+            "cpu_dsbulk": cpu_dsbulk,
+            # Compression and decompression tools are the other children.
+            "cpu_codec": max(cpu_children - cpu_dsbulk, 0.0),
+        }
+
+
+def _dir_size(path: str) -> int:
+    """Return total size of data files in a dump."""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+def _scenarios(args: argparse.Namespace) -> Iterator[dict[str, Any]]:
+    """Generate combinations of options to benchmark, skipping combinations
+    of codec and format which cannot be dumped, e.g. when compression tool
+    is not installed.
+    """
+    for jobs, codec, bundle, file_format in itertools.product(
+        args.jobs, args.codec, args.bundle, args.format
+    ):
+        try:
+            # Same check as in dump-keyspace.
+            _clone_keyspace._check_format(file_format, codec)
+        except (ValueError, RuntimeError, ImportError) as exc:
+            logging.warning("Skipping codec %s with format %s: %s", codec, file_format, exc)
+            continue
+        yield {
+            "jobs": jobs,
+            "codec": codec,
+            "bundle": None if bundle == "none" else bundle,
+            "format": file_format,
+        }
+
+
+def _run(args: argparse.Namespace, work_dir: str) -> PrettyTable:
+    """Run all scenarios and return a table with results."""
+    tables = [f"Table{idx:03d}" for idx in range(args.tables)]
+    # Estimated size only matters for scheduling and progress.
+    table_size = args.rows * args.columns * 10
+    dsbulk_log = os.path.join(work_dir, "dsbulk.jsonl")
+    os.environ.update(
+        {
+            fake_dsbulk.ENV_PREFIX + "ROWS": str(args.rows),
+            fake_dsbulk.ENV_PREFIX + "COLUMNS": str(args.columns),
+            fake_dsbulk.ENV_PREFIX + "WIDTH": str(args.width),
+            fake_dsbulk.ENV_PREFIX + "RATE": str(args.rate),
+            fake_dsbulk.ENV_PREFIX + "LOG": dsbulk_log,
+        }
+    )
+
+    result_table = PrettyTable(
+        [
+            "Operation",
+            "Jobs",
+            "Codec",
+            "Bundle",
+            "Format",
+            "Wall, s",
+            "Rows/s",
+            "CSV MiB/s",
+            "Stored MiB",
+            "CPU process, s",
+            "CPU dsbulk, s",
+            "CPU codec, s",
+        ]
+    )
+    for idx, scenario in enumerate(_scenarios(args)):
+        name = f"dump{idx}" + (f".{scenario['bundle']}" if scenario["bundle"] else "")
+        destination = os.path.join(work_dir, name)
+        if scenario["bundle"] is None:
+            os.makedirs(destination)
+        measurements: list[tuple[str, dict[str, float]]] = []
+
+        cluster = _Cluster(tables, tables, args.columns, table_size)
+        with mock.patch.object(_clone_keyspace, "_make_cluster", return_value=cluster):
+            usage = _Usage(dsbulk_log)
+            _clone_keyspace.clone_dump_keyspace(
+                keyspace=_KEYSPACE,
+                destination=destination,
+                hosts=["localhost"],
+                port=9042,
+                username=None,
+                password=None,
+                table_patterns=[],
+                jobs=scenario["jobs"],
+                shards=args.shards,
+                shard_patterns=[],
+                codec=scenario["codec"],
+                codec_level=None,
+                bundle=scenario["bundle"],
+                tmp_dir=os.path.join(work_dir, "tmp"),
+                transfer_jobs=4,
+                transfer_retries=0,
+                transfer_bandwidth=None,
+                resume=False,
+                file_format=scenario["format"],
+            )
+            measurements.append(("dump", usage.result()))
+        stored_size = _dir_size(destination)
+
+        if args.operation == "both":
+            cluster = _Cluster(tables, [], args.columns, table_size)
+            with mock.patch.object(_clone_keyspace, "_make_cluster", return_value=cluster):
+                usage = _Usage(dsbulk_log)
+                _clone_keyspace.clone_load_keyspace(
+                    keyspace=_KEYSPACE,
+                    folder=destination,
+                    hosts=["localhost"],
+                    port=9042,
+                    username=None,
+                    password=None,
+                    table_patterns=[],
+                    skip_existing_tables=False,
+                    jobs=scenario["jobs"],
+                    max_concurrent_queries=None,
+                    prefetch=3,
+                    log_dir=os.path.join(work_dir, f"load{idx}"),
+                    resume=False,
+                    dry_run=False,
+                )
+                measurements.append(("load", usage.result()))
+
+        for operation, measurement in measurements:
+            wall = max(measurement["wall"], 1e-6)
+            result_table.add_row(
+                [
+                    operation,
+                    scenario["jobs"],
+                    scenario["codec"],
+                    scenario["bundle"] or "none",
+                    scenario["format"],
+                    f"{wall:.2f}",
+                    f"{measurement['rows'] / wall:.0f}",
+                    f"{measurement['size'] / 2**20 / wall:.1f}",
+                    f"{stored_size / 2**20:.1f}",
+                    f"{measurement['cpu_process']:.2f}",
+                    f"{measurement['cpu_dsbulk']:.2f}",
+                    f"{measurement['cpu_codec']:.2f}",
+                ]
+            )
+        if not args.keep:
+            if os.path.isdir(destination):
+                shutil.rmtree(destination)
+            else:
+                os.remove(destination)
+                with_index = destination + ".index.json"
+                if os.path.exists(with_index):
+                    os.remove(with_index)
+    return result_table
+
+
+def main() -> int:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description="Offline benchmark of clone-keyspace pipelines.")
+    parser.add_argument("--tables", type=int, default=4, help="Number of tables, default: %(default)s.")
+    parser.add_argument("--rows", type=int, default=200_000, help="Rows per table, default: %(default)s.")
+    parser.add_argument(
+        "--columns", type=int, default=10, help="Number of columns in a table, default: %(default)s."
+    )
+    parser.add_argument(
+        "--width", type=int, default=32, help="Width of text values in characters, default: %(default)s."
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0.0,
+        help="Data rate of each fake dsbulk process in MiB/s, 0 for unlimited, default: %(default)s.",
+    )
+    parser.add_argument("--shards", type=int, default=1, help="Number of shards per table.")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 4], help="Values of --jobs option.")
+    parser.add_argument(
+        "--codec", nargs="+", default=["gzip"], choices=list(_clone_keyspace._CODECS), help="Codecs."
+    )
+    parser.add_argument(
+        "--bundle", nargs="+", default=["none"], choices=["none", "tar", "zip"], help="Bundle modes."
+    )
+    parser.add_argument(
+        "--format", nargs="+", default=["csv"], choices=list(_clone_keyspace._FORMATS), help="File formats."
+    )
+    parser.add_argument(
+        "--operation", default="both", choices=["dump", "both"], help="Run dump only or dump and load."
+    )
+    parser.add_argument("--work-dir", help="Directory for dumped data, temporary directory by default.")
+    parser.add_argument("--keep", action="store_true", help="Do not remove dumped data.")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Log clone-keyspace messages.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    with tempfile.TemporaryDirectory(dir=args.work_dir) as work_dir:
+        # Fake dsbulk has to run with the same Python.
+        bin_dir = os.path.join(work_dir, "bin")
+        os.makedirs(bin_dir)
+        dsbulk = os.path.join(bin_dir, "dsbulk")
+        with open(dsbulk, "w") as shim:
+            script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_dsbulk.py")
+            print(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"', file=shim)
+        os.chmod(dsbulk, 0o755)
+        os.environ["PATH"] = bin_dir + os.pathsep + os.environ["PATH"]
+        print(_run(args, work_dir))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
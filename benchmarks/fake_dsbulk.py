@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# This file is part of dax_apdb_deploy.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Replacement of dsbulk for offline benchmarks of clone-keyspace.
+
+``unload`` writes deterministic synthetic CSV data to stdout, ``load``
+reads and discards CSV data from stdin, both optionally at a limited rate.
+Configuration is passed in environment variables by
+``clone_keyspace_bench.py``, which also uses the column types defined
+here. When a process finishes it appends a JSON record with row count,
+data size and its CPU time to a log file.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import sys
+import time
+import zlib
+
+# Environment variables used to pass configuration to fake dsbulk.
+ENV_PREFIX = "CLONE_KEYSPACE_BENCH_"
+
+# Number of distinct rows generated for each table, data repeats with
+# different keys after that.
+_BLOCK_ROWS = 4096
+
+
+def column_types(n_columns: int) -> dict[str, str]:
+    """Return CQL types of the synthetic table columns, first column is the
+    partition key.
+    """
+    types = {"id": "bigint"}
+    for idx in range(1, n_columns):
+        types[f"c{idx}"] = ("double", "bigint", "text", "timestamp")[idx % 4]
+    return types
+
+
+def _row_block(table: str, n_columns: int, width: int) -> list[str]:
+    """Generate CSV lines for a block of rows without the partition key,
+    contents depend only on table name and shape.
+    """
+    rng = random.Random(zlib.crc32(table.encode()))
+    words = ["".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(3, 9))) for _ in range(256)]
+    lines = []
+    for _ in range(_BLOCK_ROWS):
+        values = []
+        for cql_type in list(column_types(n_columns).values())[1:]:
+            if cql_type == "double":
+                values.append(repr(rng.gauss(0.0, 100.0)))
+            elif cql_type == "bigint":
+                values.append(str(rng.getrandbits(40)))
+            elif cql_type == "timestamp":
+                month, day, millis = rng.randint(1, 12), rng.randint(1, 28), rng.randrange(1000)
+                values.append(f"2025-{month:02d}-{day:02d}T12:00:00.{millis:03d}Z")
+            else:
+                text = " ".join(rng.choices(words, k=max(width // 6, 1)))[:width]
+                values.append(f'"{text}"')
+        lines.append(",".join(values) + "\n")
+    return lines
+
+
+class _Throttle:
+    """Limit of the data rate of one process, ``rate`` is in MiB/s, zero
+    means no limit.
+    """
+
+    def __init__(self, rate: float):
+        self._rate = rate * 2**20
+        self._start = time.monotonic()
+        self._size = 0
+
+    def update(self, size: int) -> None:
+        self._size += size
+        if self._rate > 0:
+            delay = self._start + self._size / self._rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+
+def main(args: list[str]) -> int:
+    """Run as a replacement of dsbulk, only options used by clone-keyspace
+    are supported.
+    """
+    if args[:1] == ["--version"]:
+        print("benchmark dsbulk")
+        return 0
+    operation = args[0]
+    options = dict(zip(args[1::2], args[2::2]))
+    n_columns = int(os.environ[ENV_PREFIX + "COLUMNS"])
+    throttle = _Throttle(float(os.environ[ENV_PREFIX + "RATE"]))
+    n_rows = 0
+    size = 0
+    if operation == "unload":
+        if (query := options.get("-query")) is not None:
+            # Token range query from sharded dump, generate proportional
+            # fraction of rows.
+            table = query.split(" FROM ")[1].split()[0].split(".")[1].strip('"')
+            start, end = (int(word) for word in query.split() if word.lstrip("-").isdigit())
+            fraction = (end - start) / 2**64
+        else:
+            table = options["-t"]
+            fraction = 1.0
+        total_rows = int(int(os.environ[ENV_PREFIX + "ROWS"]) * fraction)
+        block = _row_block(table, n_columns, int(os.environ[ENV_PREFIX + "WIDTH"]))
+        out = sys.stdout.buffer
+        if total_rows:
+            header = ",".join(column_types(n_columns)).encode() + b"\n"
+            out.write(header)
+            size += len(header)
+        for first in range(0, total_rows, _BLOCK_ROWS):
+            count = min(_BLOCK_ROWS, total_rows - first)
+            data = "".join(f"{first + idx},{block[idx]}" for idx in range(count)).encode()
+            out.write(data)
+            n_rows += count
+            size += len(data)
+            throttle.update(len(data))
+        out.flush()
+    elif operation == "load":
+        stdin = sys.stdin.buffer
+        while data := stdin.read(1024 * 1024):
+            n_rows += data.count(b"\n")
+            size += len(data)
+            throttle.update(len(data))
+        n_rows = max(n_rows - 1, 0)
+    else:
+        print(f"Unsupported operation {operation}", file=sys.stderr)
+        return 1
+    # Report what was done and CPU time used by this process.
+    times = os.times()
+    record = {"operation": operation, "rows": n_rows, "size": size, "cpu": times.user + times.system}
+    with open(os.environ[ENV_PREFIX + "LOG"], "a") as log:
+        print(json.dumps(record), file=log)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -83,6 +83,7 @@ class CloneKeyspaceClI(CLI):
         self._create_list_keyspaces(subparsers)
         self._create_dump_keyspace(subparsers)
         self._create_load_keyspace(subparsers)
+        self._create_copy_keyspace(subparsers)
 
     def _create_list_keyspaces(self, subparsers: argparse._SubParsersAction) -> None:
         parser = subparsers.add_parser("list-keyspaces", help="Show existing keyspaces.")
@@ -119,6 +120,48 @@ class CloneKeyspaceClI(CLI):
             metavar="COUNT",
             help="Number of concurrent jobs, default: %(default)s.",
         )
+        parser.add_argument(
+            "--shards",
+            type=int,
+            default=1,
+            metavar="COUNT",
+            help=(
+                "Split tables into this many token-range shards, each shard is dumped into a separate "
+                "file by a separate job, default: %(default)s."
+            ),
+        )
+        parser.add_argument(
+            "--shard-table-pattern",
+            dest="shard_patterns",
+            type=str,
+            action="append",
+            default=[],
+            metavar="GLOB_PATTERN",
+            help=(
+                "Only split specified tables into shards, argument is a pattern that matches one or more "
+                "table names. By default all tables are split when --shards is larger than 1."
+            ),
+        )
+        parser.add_argument(
+            "--codec",
+            type=str,
+            default="gzip",
+            choices=("gzip", "pigz", "zstd", "none"),
+            help=(
+                "Compression codec for dumped data, pigz is a multi-threaded gzip, zstd is "
+                "multi-threaded, corresponding tool must be in $PATH, default: %(default)s."
+            ),
+        )
+        parser.add_argument(
+            "--codec-level",
+            type=int,
+            default=None,
+            metavar="LEVEL",
+            help=(
+                "Compression level, gzip and pigz support 1-9, zstd supports 1-19, none does not support "
+                "levels. Default is codec-specific: gzip 9, pigz 6, zstd 3."
+            ),
+        )
         parser.add_argument(
             "-b",
             "--bundle",
@@ -141,12 +184,123 @@ class CloneKeyspaceClI(CLI):
                 "Must be specified when `--bundle` is given or when destination is a remote (S3) path."
             ),
         )
+        parser.add_argument(
+            "--transfer-jobs",
+            type=int,
+            default=4,
+            metavar="COUNT",
+            help="Number of concurrent file transfers to remote (S3) destination, default: %(default)s.",
+        )
+        parser.add_argument(
+            "--transfer-retries",
+            type=int,
+            default=3,
+            metavar="COUNT",
+            help="Number of retries for each failed file transfer, default: %(default)s.",
+        )
+        parser.add_argument(
+            "--transfer-bandwidth",
+            type=float,
+            default=None,
+            metavar="MIB_PER_SEC",
+            help="Limit on aggregate transfer rate to remote (S3) destination in MiB/s, default: no limit.",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help=(
+                "Continue interrupted dump to the same destination, files that were completely dumped "
+                "are not dumped again. Cannot be used with --bundle."
+            ),
+        )
+        parser.add_argument(
+            "--verify-resume",
+            action="store_true",
+            help=(
+                "With --resume, verify checksums of the files that were already dumped by reading them "
+                "again, by default only their size is checked."
+            ),
+        )
+        parser.add_argument(
+            "--engine",
+            choices=("dsbulk", "native"),
+            default="dsbulk",
+            help=(
+                "Engine for reading table data, 'dsbulk' runs dsbulk for each table or shard, 'native' "
+                "uses concurrent queries from a single process, which is faster for many small tables; "
+                "default: %(default)s."
+            ),
+        )
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=("csv", "parquet", "arrow"),
+            default="csv",
+            help=(
+                "Format of data files, 'parquet' and 'arrow' (Arrow IPC) store typed columns and need "
+                "pyarrow package. Compression of these formats is internal, --codec selects compression "
+                "algorithm, Arrow IPC only supports zstd or none. Default: %(default)s."
+            ),
+        )
+        parser.add_argument(
+            "--small-table-size",
+            type=float,
+            default=None,
+            metavar="MIB",
+            help=(
+                "With dsbulk engine, dump tables with estimated size below this value in MiB using native "
+                "engine, to avoid starting dsbulk for each small table. Table size is estimated for the "
+                "whole cluster from the size estimates of one node; default: all tables use dsbulk."
+            ),
+        )
+        parser.add_argument(
+            "--incremental",
+            type=str,
+            default=None,
+            metavar="BASE",
+            help=(
+                "Make incremental dump based on an earlier dump (folder, archive, or remote URL). Time "
+                "partitions older than the newest partition in the base dump are not dumped again, "
+                "restore reads them from the base dump. Default: complete dump."
+            ),
+        )
+        parser.add_argument(
+            "--sample",
+            type=float,
+            default=None,
+            metavar="FRACTION",
+            help=(
+                "Only dump partitions from a fraction (0 to 1) of the token ring, the same token range is "
+                "used for all tables, so tables with the same partition key get the same partitions. "
+                "Default: dump all data."
+            ),
+        )
+        parser.add_argument(
+            "--sample-table-pattern",
+            dest="sample_patterns",
+            type=str,
+            action="append",
+            default=[],
+            metavar="GLOB_PATTERN",
+            help=(
+                "Only sample specified tables, other tables are dumped completely, argument is a pattern "
+                "that matches one or more table names. By default all tables are sampled with --sample."
+            ),
+        )
         parser.set_defaults(method=scripts.clone_dump_keyspace)
 
     def _create_load_keyspace(self, subparsers: argparse._SubParsersAction) -> None:
-        parser = subparsers.add_parser("load-keyspace", help="Load keyspace data from a folder.")
+        parser = subparsers.add_parser("load-keyspace", help="Load keyspace data from a folder or archive.")
         parser.add_argument("keyspace", type=str, help="Keyspace name.")
-        parser.add_argument("folder", type=str, help="Folder with keyspace data created by dump-keyspace.")
+        parser.add_argument(
+            "folder",
+            type=str,
+            help=(
+                "Folder or archive with keyspace data created by dump-keyspace, this can be either a local "
+                "filesystem path or URL on remote (S3) store, remote data is streamed without a local copy. "
+                "Archives (.tar or .zip) are read directly without unpacking."
+            ),
+        )
         parser.add_argument(
             "-t",
             "--table-pattern",
@@ -177,9 +331,167 @@ class CloneKeyspaceClI(CLI):
             metavar="COUNT",
             help="Limit number concurrent queries, one of AUTO, <N>, <N>C default: AUTO.",
         )
+        parser.add_argument(
+            "--prefetch",
+            type=int,
+            default=4,
+            metavar="COUNT",
+            help=(
+                "Number of concurrent range requests for reading each remote data file, default: %(default)s."
+            ),
+        )
+        parser.add_argument(
+            "--log-dir",
+            type=str,
+            default=None,
+            metavar="PATH",
+            help=(
+                "Local directory for dsbulk log files and load journal, by default logs are written to "
+                "the folder with the data, or to a temporary directory if data is remote."
+            ),
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help=(
+                "Continue interrupted restore, files that were completely loaded are not loaded again. "
+                "Use the same --log-dir as in the interrupted run."
+            ),
+        )
+        parser.add_argument(
+            "--engine",
+            choices=("dsbulk", "native"),
+            default="dsbulk",
+            help=(
+                "Engine for writing table data, 'dsbulk' runs dsbulk for each data file, 'native' "
+                "inserts data with concurrent requests from a single process; default: %(default)s."
+            ),
+        )
+        parser.add_argument(
+            "--adaptive-concurrency",
+            type=str,
+            default=None,
+            metavar="MIN:MAX",
+            help=(
+                "Adjust number of concurrent requests of all jobs to observed write latency and timeouts, "
+                "keeping it within specified bounds, timed out requests are retried. Only for native "
+                "engine, default is a fixed limit per job given by --max-concurrent-queries."
+            ),
+        )
+        parser.add_argument(
+            "--small-table-size",
+            type=float,
+            default=None,
+            metavar="MIB",
+            help=(
+                "With dsbulk engine, load data files smaller than this value in MiB using native engine, "
+                "to avoid starting dsbulk for each small file; default: all files use dsbulk."
+            ),
+        )
         parser.add_argument("--dry-run", action="store_true", help="Do not restore, only print actions.")
         parser.set_defaults(method=scripts.clone_load_keyspace)
 
+    def _create_copy_keyspace(self, subparsers: argparse._SubParsersAction) -> None:
+        parser = subparsers.add_parser(
+            "copy-keyspace", help="Copy keyspace data directly to a different cluster."
+        )
+        parser.add_argument("keyspace", type=str, help="Keyspace name to copy.")
+        parser.add_argument(
+            "--dest-host",
+            dest="dest_hosts",
+            type=str,
+            action="append",
+            required=True,
+            metavar="HOST",
+            help="Address of a host in destination cluster, can be repeated.",
+        )
+        parser.add_argument(
+            "--dest-keyspace",
+            type=str,
+            default=None,
+            metavar="KEYSPACE",
+            help="Keyspace name in destination cluster, must exist; default: same as source keyspace.",
+        )
+        parser.add_argument(
+            "--dest-port",
+            type=int,
+            default=None,
+            help="Cassandra port number of destination cluster, default: same as --port.",
+        )
+        parser.add_argument(
+            "--dest-username",
+            default=None,
+            help="Cassandra user name for destination cluster, default: same as for source cluster.",
+        )
+        parser.add_argument(
+            "--dest-password",
+            default=None,
+            help="Cassandra password for destination cluster, default: same as for source cluster.",
+        )
+        parser.add_argument(
+            "-t",
+            "--table-pattern",
+            dest="table_patterns",
+            type=str,
+            action="append",
+            default=[],
+            metavar="GLOB_PATTERN",
+            help=("Only copy specified tables, argument is a pattern that matches one or more table names."),
+        )
+        parser.add_argument(
+            "--skip-existing-tables",
+            action="store_true",
+            help="Do not copy tables that exist in destination keyspace.",
+        )
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=1,
+            metavar="COUNT",
+            help="Number of concurrent jobs, default: %(default)s.",
+        )
+        parser.add_argument(
+            "--shards",
+            type=int,
+            default=1,
+            metavar="COUNT",
+            help=(
+                "Split tables into this many token-range shards, each shard is copied by a separate job, "
+                "default: %(default)s."
+            ),
+        )
+        parser.add_argument(
+            "--shard-table-pattern",
+            dest="shard_patterns",
+            type=str,
+            action="append",
+            default=[],
+            metavar="GLOB_PATTERN",
+            help=(
+                "Only split specified tables into shards, argument is a pattern that matches one or more "
+                "table names. By default all tables are split when --shards is larger than 1."
+            ),
+        )
+        parser.add_argument(
+            "--max-concurrent-queries",
+            type=str,
+            default=None,
+            metavar="COUNT",
+            help="Limit number concurrent queries for loading, one of AUTO, <N>, <N>C default: AUTO.",
+        )
+        parser.add_argument(
+            "--log-dir",
+            type=str,
+            default=None,
+            metavar="PATH",
+            help=(
+                "Local directory for dsbulk log files and run report, by default logs are written to "
+                "a temporary directory."
+            ),
+        )
+        parser.set_defaults(method=scripts.clone_copy_keyspace)
+
     def post_process_args(self, options: argparse.Namespace) -> argparse.Namespace:
         """Post process command line arguments.
 
@@ -1,4 +1,9 @@
-from ._clone_keyspace import clone_dump_keyspace, clone_load_keyspace, clone_list_keyspaces
+from ._clone_keyspace import (
+    clone_copy_keyspace,
+    clone_dump_keyspace,
+    clone_list_keyspaces,
+    clone_load_keyspace,
+)
 from ._medusa_backups import (
     medusa_delete_backup,
     medusa_make_backup,
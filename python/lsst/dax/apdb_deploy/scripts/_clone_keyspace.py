@@ -22,29 +22,57 @@
 from __future__ import annotations
 
 import asyncio
+import base64
+import codecs
+import csv
+import dataclasses
+import datetime
+import decimal
 import fnmatch
+import getpass
 import gzip
+import inspect
+import io
+import itertools
 import json
 import logging
+import math
 import os
 import re
-import shlex
+import shutil
+import signal
+import struct
 import subprocess
 import tarfile
 import tempfile
 import time
+import uuid
 import zipfile
-from collections.abc import Iterator
-from contextlib import ExitStack
+import zlib
+from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterator, Callable, Iterable, Iterator, Mapping, Sequence
+from contextlib import ExitStack, aclosing, contextmanager, suppress
 from string import Template
-from typing import Literal
+from typing import Any, BinaryIO, Literal, cast
 
+from cassandra import OperationTimedOut, WriteTimeout
 from cassandra.auth import AuthProvider, PlainTextAuthProvider
 from cassandra.cluster import Cluster, Session
-from cassandra.policies import RoundRobinPolicy
+from cassandra.policies import DCAwareRoundRobinPolicy, TokenAwarePolicy
+from cassandra.protocol import OverloadedErrorMessage, ServerError
+from cassandra.query import BatchStatement, BatchType, BoundStatement, PreparedStatement, Statement
+from cassandra.util import SortedSet, Time
 from prettytable import PrettyTable
 
-from lsst.resources import ResourcePath
+from lsst.resources import ResourceHandleProtocol, ResourcePath
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    # Columnar data formats are optional.
+    pyarrow = None
 
 _LOG = logging.getLogger(__name__)
 
@@ -56,6 +84,686 @@ _CREATE_TABLE_RE = re.compile("(.*CREATE TABLE )([^.]+)([.].*)", re.DOTALL)
 # Location of the dsbulk log files relative to other dumped files.
 _DSBULK_LOG = "_dsbulk_log"
 
+# Location of the dump journal files relative to other dumped files.
+_JOURNAL = "_journal"
+
+# Name of the dump run report, and interval in seconds for logging progress.
+_REPORT = "report.json"
+_PROGRESS_INTERVAL = 60.0
+
+# File in incremental dump with the locations of data files that are taken
+# from earlier dumps.
+_INCREMENTAL = "incremental.json"
+
+# File in sampled dump describing the sample, it marks the dump as partial.
+_SAMPLE = "sample.json"
+
+# APDB tables partitioned by time have partition number appended to their
+# names, only the newest partition of a table receives new data.
+_TIME_PARTITION_RE = re.compile(r"(.+)_(\d+)")
+
+# Size of the upload parts when streaming archive to S3, S3 allows at most
+# 10000 parts, so this limits archive size to ~5TB.
+_STREAM_PART_SIZE = 512 * 1024 * 1024
+
+# Size of the chunks for reading remote data files.
+_READ_CHUNK_SIZE = 16 * 1024 * 1024
+
+# Maximum size of the chunks read from process output.
+_PIPE_CHUNK_SIZE = 1024 * 1024
+
+# Dumped data is written to files in blocks of this size.
+_WRITE_BLOCK_SIZE = 16 * 1024 * 1024
+
+# Number of chunks buffered between unload and load when copying a table
+# between clusters.
+_COPY_QUEUE_SIZE = 16
+
+# Compressed files larger than this are not checked for being empty.
+_EMPTY_COMPRESSED_SIZE = 4096
+
+# Structure of zip local file header, last two fields are lengths of file
+# name and extra field which follow the header.
+_ZIP_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+
+# Full token range of Murmur3Partitioner, minimum token is never assigned to
+# any partition, so (_MIN_TOKEN, _MAX_TOKEN] covers everything.
+_MIN_TOKEN = -(2**63)
+_MAX_TOKEN = 2**63 - 1
+
+# Number of concurrent token-range queries for each file with native engine,
+# page size, and timeout for one page in seconds.
+_NATIVE_SPLITS = 8
+_NATIVE_FETCH_SIZE = 5000
+_NATIVE_TIMEOUT = 120.0
+
+# Values containing these characters or empty need to be quoted in CSV.
+_CSV_QUOTE_RE = re.compile(r'[,"\\\r\n]')
+
+# Escape sequences in quoted CSV values, quotes and backslashes are escaped
+# with a backslash (dsbulk default), other backslashes are literal. Same
+# rule is used for writing (`_csv_field`), parsing (`_parse_csv`) and
+# counting rows (`_CsvCounter`).
+_CSV_ESCAPE_RE = re.compile(r'\\(["\\])')
+_CSV_ESCAPE_BYTES_RE = re.compile(rb'\\["\\]')
+
+# Empty quoted value in CSV written by dsbulk, it cannot appear anywhere else
+# because quotes inside values are escaped with a backslash.
+_CSV_EMPTY_FIELD_RE = re.compile(r'(?:^|(?<=,))""(?=,|\r?$)', re.MULTILINE)
+
+# Placeholder for empty string values when parsing CSV, nulls are empty.
+_CSV_EMPTY = "\x00"
+
+# Incomplete CSV record longer than this is an error, e.g. a quoted value
+# that is not terminated.
+_CSV_MAX_RECORD_SIZE = 64 * 1024 * 1024
+
+# Maximum number of rows in a batch, for native load engine, and default
+# number of concurrent requests for each file.
+_NATIVE_BATCH_ROWS = 16
+_NATIVE_CONCURRENCY = 64
+
+# Errors which mean that the cluster cannot keep up with the load, adaptive
+# concurrency is reduced and the request is retried at most this many times.
+_OVERLOAD_ERRORS = (OperationTimedOut, WriteTimeout, OverloadedErrorMessage)
+_ADAPTIVE_RETRIES = 5
+
+# Adaptive concurrency is reduced by this factor after an overload error, or
+# after a request whose latency exceeds the baseline latency by more than
+# _ADAPTIVE_LATENCY_FACTOR.
+_ADAPTIVE_TIMEOUT_DECREASE = 0.5
+_ADAPTIVE_LATENCY_DECREASE = 0.9
+_ADAPTIVE_LATENCY_FACTOR = 4.0
+
+# Formats of data files, columnar formats are mapped to their file name
+# extensions.
+_FORMATS = ("csv", "parquet", "arrow")
+_COLUMNAR_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# Number of rows in a record batch written to or read from columnar files,
+# in Parquet each batch is a row group.
+_COLUMNAR_BATCH_ROWS = 128 * 1024
+
+# Number of concurrent CREATE TABLE statements, and timeout for one statement
+# in seconds. Statements failing with these errors are retried at most
+# _DDL_RETRIES times, schema agreement check is retried the same number of
+# times, each waiting at most _SCHEMA_AGREEMENT_WAIT seconds.
+_DDL_CONCURRENCY = 16
+_DDL_TIMEOUT = 600.0
+_DDL_RETRY_ERRORS = (OperationTimedOut, ServerError)
+_DDL_RETRIES = 5
+_SCHEMA_AGREEMENT_WAIT = 60.0
+
+# Number of concurrent DESCRIBE queries when extracting schema.
+_DESCRIBE_CONCURRENCY = 32
+
+
+@dataclasses.dataclass(frozen=True)
+class _Codec:
+    """Description of a compression codec for data files, compression is done
+    by external command-line tools.
+    """
+
+    name: str
+    """Codec name, used in command line options."""
+
+    extension: str
+    """File name extension for compressed files, empty if no compression."""
+
+    compress_cmd: tuple[str, ...]
+    """Command to compress stdin to stdout, empty for no compression."""
+
+    decompress_cmd: tuple[str, ...]
+    """Command to decompress stdin to stdout, empty for no compression."""
+
+    default_level: int | None = None
+    """Default compression level."""
+
+    columnar: str | None = None
+    """Name of the compression used inside columnar data files, `None` for
+    no compression.
+    """
+
+    levels: tuple[int, int] | None = None
+    """Range of supported compression levels, inclusive, `None` if level
+    cannot be specified.
+    """
+
+    def check_level(self, level: int | None) -> None:
+        """Check that compression level is supported by the codec.
+
+        Raises
+        ------
+        ValueError
+            Raised if level is outside supported range.
+        """
+        if level is None:
+            return
+        if self.levels is None:
+            raise ValueError(f"Codec {self.name} does not support compression level.")
+        low, high = self.levels
+        if not low <= level <= high:
+            raise ValueError(f"Compression level for codec {self.name} must be between {low} and {high}.")
+
+    def compress_command(self, level: int | None) -> list[str]:
+        """Return compression command with compression level option."""
+        if not self.compress_cmd:
+            return []
+        if level is None:
+            level = self.default_level
+        return list(self.compress_cmd) + ([f"-{level}"] if level is not None else [])
+
+
+# Known compression codecs. Order is important, first codec with matching
+# extension is used for decompression.
+_CODECS = {
+    codec.name: codec
+    for codec in (
+        _Codec("gzip", ".gz", ("gzip", "-c"), ("gzip", "-dc"), 9, "gzip", (1, 9)),
+        # Multi-threaded gzip, produces regular gzip files.
+        _Codec("pigz", ".gz", ("pigz", "-c"), ("pigz", "-dc"), 6, "gzip", (1, 9)),
+        # Multi-threaded zstd, levels 20 and above need --ultra, not
+        # supported.
+        _Codec("zstd", ".zst", ("zstd", "-q", "-c", "-T0"), ("zstd", "-q", "-dc"), 3, "zstd", (1, 19)),
+        _Codec("none", "", (), ()),
+    )
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class _DataFile:
+    """Description of one data file in a dump, either a whole table or one
+    token-range shard of a table.
+    """
+
+    table: str
+    """Table name."""
+
+    shard: int | None = None
+    """Shard number, `None` if table is not sharded."""
+
+    token_range: tuple[int, int] | None = None
+    """Token range for this shard or sample, lower bound is exclusive, upper
+    bound is inclusive. Only used during dump, `None` for tables that are
+    dumped completely into one file.
+    """
+
+    codec: str = "gzip"
+    """Name of the compression codec."""
+
+    file_format: str = "csv"
+    """Format of the data file, one of `_FORMATS`."""
+
+    @property
+    def file_name(self) -> str:
+        """Name of the data file (`str`)."""
+        if self.file_format == "csv":
+            extension = ".csv" + _CODECS[self.codec].extension
+        else:
+            extension = _COLUMNAR_EXTENSIONS[self.file_format]
+        if self.shard is None:
+            return f"{self.table}{extension}"
+        return f"{self.table}.{self.shard}{extension}"
+
+    @classmethod
+    def from_file_name(cls, file_name: str) -> _DataFile | None:
+        """Parse data file name, return `None` if name does not look like a
+        data file name.
+
+        Format and compression codec are determined from the file extension,
+        columnar files use internal compression, their codec is "none".
+        """
+        candidates = [(".csv" + codec.extension, "csv", codec.name) for codec in _CODECS.values()]
+        candidates += [
+            (extension, file_format, "none") for file_format, extension in _COLUMNAR_EXTENSIONS.items()
+        ]
+        for extension, file_format, codec_name in candidates:
+            if file_name.endswith(extension):
+                break
+        else:
+            return None
+        # Cassandra table names cannot contain dots.
+        stem = file_name.removesuffix(extension)
+        table, _, shard = stem.partition(".")
+        if not shard:
+            return cls(table, codec=codec_name, file_format=file_format)
+        if not shard.isdigit():
+            return None
+        return cls(table, int(shard), codec=codec_name, file_format=file_format)
+
+
+@dataclasses.dataclass(frozen=True)
+class _FileInfo:
+    """Information about a complete file in a dump."""
+
+    name: str
+    """File name."""
+
+    size: int
+    """File size in bytes."""
+
+    crc32: str
+    """CRC32 checksum of file contents as a hexadecimal string."""
+
+    raw_size: int
+    """Size of uncompressed CSV data in bytes."""
+
+    rows: int
+    """Number of rows in CSV data, not including header."""
+
+    @classmethod
+    def from_counters(cls, name: str, stored: _ByteCounter, raw: _CsvCounter) -> _FileInfo:
+        """Make an instance from the counters of a data stream."""
+        return cls(name, stored.size, stored.hexdigest, raw.size, raw.rows)
+
+    def verify(self, stored: _ByteCounter, raw: _CsvCounter) -> None:
+        """Check that the counters of a data stream match this file.
+
+        Raises
+        ------
+        ValueError
+            Raised if there is a mismatch.
+        """
+        actual = self.from_counters(self.name, stored, raw)
+        self._compare(dataclasses.asdict(actual))
+
+    def verify_rows(self, size: int, rows: int) -> None:
+        """Check that the size and row count of a columnar data file match
+        this file. Checksum is not verified, columnar files are not read
+        sequentially.
+
+        Raises
+        ------
+        ValueError
+            Raised if there is a mismatch.
+        """
+        self._compare({"size": size, "rows": rows})
+
+    def _compare(self, actual: dict[str, Any]) -> None:
+        mismatches = [
+            f"{name}={value} (expected {getattr(self, name)})"
+            for name, value in actual.items()
+            if value != getattr(self, name)
+        ]
+        if mismatches:
+            raise ValueError(f"Data file {self.name} does not match manifest: {', '.join(mismatches)}")
+
+
+class _ByteCounter:
+    """Running size and CRC32 checksum of a byte stream."""
+
+    def __init__(self) -> None:
+        self.size = 0
+        self.crc32 = 0
+
+    def update(self, data: bytes) -> None:
+        """Account for the next piece of the stream."""
+        self.size += len(data)
+        self.crc32 = zlib.crc32(data, self.crc32)
+
+    @property
+    def hexdigest(self) -> str:
+        """Checksum as a hexadecimal string (`str`)."""
+        return f"{self.crc32:08x}"
+
+
+class _CsvCounter:
+    """Running size and row count of a CSV stream.
+
+    Notes
+    -----
+    Quoted values can contain newlines, only newlines outside quotes are
+    counted. Quotes and backslashes inside quoted values are escaped with a
+    backslash (`_CSV_ESCAPE_RE`), or quotes are doubled, after removing
+    escape sequences the parity of the number of quotes tells whether a
+    position is inside a quoted value. The first line of the stream is a
+    header written by dsbulk.
+    """
+
+    def __init__(self) -> None:
+        self.size = 0
+        self._lines = 0
+        self._quoted = False
+        self._escape = False
+        self._last = b""
+
+    def update(self, data: bytes) -> None:
+        """Account for the next piece of the stream."""
+        if not data:
+            return
+        self.size += len(data)
+        text = data
+        if self._escape and text[:1] in (b'"', b"\\"):
+            # Escape sequence split between pieces.
+            text = text[1:]
+        # Odd number of trailing backslashes starts an escape sequence.
+        self._escape = (len(text) - len(text.rstrip(b"\\"))) % 2 == 1
+        if b'"' in text:
+            parts = _CSV_ESCAPE_BYTES_RE.sub(b"", text).split(b'"')
+            # Every other part is outside quotes.
+            self._lines += sum(part.count(b"\n") for part in parts[int(self._quoted) :: 2])
+            if len(parts) % 2 == 0:
+                self._quoted = not self._quoted
+        elif not self._quoted:
+            self._lines += text.count(b"\n")
+        self._last = data[-1:]
+
+    @property
+    def rows(self) -> int:
+        """Number of data rows seen so far (`int`)."""
+        lines = self._lines + (1 if self.size and self._last != b"\n" else 0)
+        return max(lines - 1, 0)
+
+
+class _DumpJournal:
+    """Journal of the files that were completely dumped to destination.
+
+    Parameters
+    ----------
+    location : `lsst.resources.ResourcePath`
+        Dump destination directory, local or remote.
+
+    Notes
+    -----
+    Each completed file is recorded in a separate small JSON file in
+    ``_journal`` sub-directory of the dump. This avoids rewriting one large
+    file for remote destinations, where appending is not possible.
+    """
+
+    def __init__(self, location: ResourcePath):
+        self._location = location.join(_JOURNAL, forceDirectory=True)
+
+    def read(self) -> dict[str, _FileInfo]:
+        """Return all records in the journal, indexed by file name."""
+        # Remote "directories" may not exist as objects, walking a missing
+        # directory simply yields nothing.
+        records = {}
+        for path in _walk_files(self._location):
+            info = _FileInfo(**json.loads(path.read()))
+            records[info.name] = info
+        return records
+
+    def add(self, info: _FileInfo) -> None:
+        """Record completed file."""
+        self._location.join(f"{info.name}.json").write(json.dumps(dataclasses.asdict(info)).encode())
+
+    def clear(self) -> None:
+        """Remove all records from the journal."""
+        for path in _walk_files(self._location):
+            path.remove()
+
+    def remove(self) -> None:
+        """Remove the journal with all its records."""
+        self.clear()
+        # Remote "directories" disappear with their last file.
+        if self._location.isLocal and os.path.isdir(self._location.ospath):
+            os.rmdir(self._location.ospath)
+
+
+class _LoadJournal:
+    """Journal of the data files that were completely loaded into a keyspace.
+
+    Parameters
+    ----------
+    path : `str`
+        Path to local journal file.
+
+    Notes
+    -----
+    Journal is a text file with one JSON record per line, records are
+    appended as loading of each file finishes. A record contains file name
+    and size, size is used to detect that the dump has changed since the
+    file was loaded.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def read(self) -> dict[str, int]:
+        """Return sizes of loaded files, indexed by file name."""
+        records: dict[str, int] = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path) as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Last line can be incomplete if process was killed.
+                    _LOG.warning("Skipping malformed journal record: %r", line)
+                    continue
+                records[record["name"]] = record["size"]
+        return records
+
+    def add(self, name: str, size: int) -> None:
+        """Record loaded file."""
+        with open(self.path, "a") as journal:
+            print(json.dumps({"name": name, "size": size}), file=journal, flush=True)
+
+    def clear(self) -> None:
+        """Remove all records from the journal."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+@dataclasses.dataclass
+class _FileProgress:
+    """Progress of dumping or loading of one data file, counters are updated
+    by the data streams while the file is processed.
+    """
+
+    name: str
+    """File name."""
+
+    table: str
+    """Table name."""
+
+    expected_size: int
+    """Expected size in bytes, estimated size of CSV data for dump, and file
+    size for restore.
+    """
+
+    raw: _CsvCounter = dataclasses.field(default_factory=_CsvCounter)
+    """Counter of CSV data."""
+
+    stored: _ByteCounter = dataclasses.field(default_factory=_ByteCounter)
+    """Counter of data stored in the file."""
+
+    batch_rows: int = 0
+    """Number of rows read from columnar file without conversion to CSV."""
+
+    start: float | None = None
+    """Time when processing started."""
+
+    end: float | None = None
+    """Time when processing finished."""
+
+    error: str | None = None
+    """Error message if processing failed."""
+
+    @property
+    def rows(self) -> int:
+        """Number of rows processed so far (`int`)."""
+        return self.raw.rows + self.batch_rows
+
+    @property
+    def status(self) -> str:
+        """Processing status, one of "pending", "running", "failed", or
+        "done" (`str`).
+        """
+        if self.start is None:
+            return "pending"
+        if self.end is None:
+            return "running"
+        return "failed" if self.error is not None else "done"
+
+    def started(self) -> None:
+        """Mark file as being processed."""
+        self.start = time.time()
+
+    def finished(self, exc: BaseException | None = None) -> None:
+        """Mark file as processed, successfully if ``exc`` is `None`."""
+        self.end = time.time()
+        if exc is not None:
+            self.error = str(exc)
+
+
+class _Progress:
+    """Progress of a dump or restore, which is logged periodically and is
+    saved as a run report at the end.
+
+    Parameters
+    ----------
+    operation : `str`
+        Name of the operation, "dump", "restore", or "copy".
+    keyspace : `str`
+        Keyspace name.
+
+    Notes
+    -----
+    Progress of a dump is measured by the size of CSV data produced relative
+    to the estimated table sizes, progress of a restore by the size of data
+    files read. Completed files count with their expected size, so errors in
+    estimates do not accumulate. Estimated completion time assumes that the
+    remaining data is processed at the average rate so far.
+    """
+
+    def __init__(self, operation: str, keyspace: str):
+        self._operation = operation
+        self._keyspace = keyspace
+        self._files: dict[str, _FileProgress] = {}
+        self._start = time.time()
+
+    def add(self, data_file: _DataFile, expected_size: int) -> _FileProgress:
+        """Add a file to be processed."""
+        progress = _FileProgress(data_file.file_name, data_file.table, expected_size)
+        self._files[progress.name] = progress
+        return progress
+
+    async def monitor(self) -> None:
+        """Log progress periodically, until cancelled."""
+        while True:
+            await asyncio.sleep(_PROGRESS_INTERVAL)
+            self.log()
+
+    def log(self) -> None:
+        """Log current progress and the state of running files."""
+        now = time.time()
+        elapsed = max(now - self._start, 1e-3)
+        files = list(self._files.values())
+        n_done = sum(1 for progress in files if progress.end is not None)
+        rows = sum(progress.rows for progress in files)
+        size = sum(progress.stored.size for progress in files)
+        total = sum(progress.expected_size for progress in files)
+        processed = sum(
+            progress.expected_size
+            if progress.end is not None
+            else min(self._processed_size(progress), progress.expected_size)
+            for progress in files
+        )
+        # Estimates can be exceeded before all files are done.
+        eta = "unknown"
+        if 0 < processed < total:
+            eta = f"{elapsed * (total - processed) / processed:.0f} sec"
+        _LOG.info(
+            "Progress of %s: %d of %d files, %d rows, %.1f MiB, %.0f rows/sec, %.2f MiB/sec, "
+            "estimated time remaining %s",
+            self._operation,
+            n_done,
+            len(files),
+            rows,
+            size / 2**20,
+            rows / elapsed,
+            size / 2**20 / elapsed,
+            eta,
+        )
+        for progress in files:
+            if progress.status == "running":
+                assert progress.start is not None
+                file_elapsed = max(now - progress.start, 1e-3)
+                _LOG.info(
+                    "  %s: %d rows, %.1f MiB, %.0f rows/sec, %.2f MiB/sec",
+                    progress.name,
+                    progress.rows,
+                    progress.stored.size / 2**20,
+                    progress.rows / file_elapsed,
+                    progress.stored.size / 2**20 / file_elapsed,
+                )
+
+    def report(self) -> dict[str, Any]:
+        """Return run report with per-file and per-table counters and
+        timings, suitable for saving as JSON.
+        """
+        files = []
+        table_files: dict[str, list[_FileProgress]] = {}
+        for progress in sorted(self._files.values(), key=lambda progress: progress.name):
+            files.append(
+                {
+                    "name": progress.name,
+                    "table": progress.table,
+                    "status": progress.status,
+                    "rows": progress.rows,
+                    "size": progress.stored.size,
+                    "raw_size": progress.raw.size,
+                    "start": _timestamp(progress.start),
+                    "elapsed": _elapsed(progress.start, progress.end),
+                    "error": progress.error,
+                }
+            )
+            table_files.setdefault(progress.table, []).append(progress)
+        tables = {}
+        for table, progresses in table_files.items():
+            statuses = {progress.status for progress in progresses}
+            starts = [progress.start for progress in progresses if progress.start is not None]
+            ends = [progress.end for progress in progresses if progress.end is not None]
+            start = min(starts, default=None)
+            end = max(ends, default=None) if statuses == {"done"} else None
+            # Table status is the least advanced status of its files.
+            status = next(status for status in ("failed", "running", "pending", "done") if status in statuses)
+            tables[table] = {
+                "status": status,
+                "files": len(progresses),
+                "rows": sum(progress.rows for progress in progresses),
+                "size": sum(progress.stored.size for progress in progresses),
+                "raw_size": sum(progress.raw.size for progress in progresses),
+                "start": _timestamp(start),
+                "elapsed": _elapsed(start, end),
+            }
+        return {
+            "version": 1,
+            "operation": self._operation,
+            "keyspace": self._keyspace,
+            "start": _timestamp(self._start),
+            "elapsed": _elapsed(self._start, time.time()),
+            "rows": sum(record["rows"] for record in files),
+            "size": sum(record["size"] for record in files),
+            "raw_size": sum(record["raw_size"] for record in files),
+            "tables": tables,
+            "files": files,
+        }
+
+    def write_report(self, path: str) -> None:
+        """Save run report as a JSON file."""
+        with open(path, "w") as out:
+            json.dump(self.report(), out, indent=1)
+
+    def _processed_size(self, progress: _FileProgress) -> int:
+        return progress.raw.size if self._operation == "dump" else progress.stored.size
+
+
+def _timestamp(value: float | None) -> str | None:
+    """Convert time to ISO format string for run report."""
+    if value is None:
+        return None
+    return datetime.datetime.fromtimestamp(value, datetime.UTC).isoformat()
+
+
+def _elapsed(start: float | None, end: float | None) -> float | None:
+    """Return time interval in seconds for run report."""
+    if start is None or end is None:
+        return None
+    return round(end - start, 3)
+
 
 def clone_list_keyspaces(*, hosts: list[str], port: int, username: str | None, password: str | None) -> None:
     """List keyspaces that exist in the cluster.
@@ -84,8 +792,23 @@ def clone_dump_keyspace(
     password: str | None,
     table_patterns: list[str],
     jobs: int,
+    shards: int,
+    shard_patterns: list[str],
+    codec: str,
+    codec_level: int | None,
     bundle: Literal["tar", "zip"] | None,
     tmp_dir: str | None,
+    transfer_jobs: int,
+    transfer_retries: int,
+    transfer_bandwidth: float | None,
+    resume: bool,
+    engine: Literal["dsbulk", "native"] = "dsbulk",
+    file_format: Literal["csv", "parquet", "arrow"] = "csv",
+    small_table_size: float | None = None,
+    incremental: str | None = None,
+    sample: float | None = None,
+    sample_patterns: list[str] | None = None,
+    verify_resume: bool = False,
 ) -> None:
     """Dump keyspace schema and data to a specified directory, archive, or
     a remote URL.
@@ -110,6 +833,19 @@ def clone_dump_keyspace(
         patterns, if empty then all tables will be dumped.
     jobs : `int`
         Number of concurrent jobs.
+    shards : `int`
+        Number of token-range shards to split each selected table into, each
+        shard is dumped by a separate job into a separate file. Value of 1
+        disables sharding.
+    shard_patterns : `list` [`str`]
+        List of patterns for the tables to be split into shards, if empty then
+        all tables will be sharded. Ignored if ``shards`` is 1.
+    codec : `str`
+        Name of the compression codec for data files, one of "gzip", "pigz"
+        (multi-threaded gzip), "zstd", or "none".
+    codec_level : `int` or `None`
+        Compression level, if `None` then codec-specific default is used.
+        Supported levels are 1-9 for "gzip" and "pigz", and 1-19 for "zstd".
     bundle : `str` or `None`
         If not `None` then bundle all files into a single archive, can be
         either "tar" or "zip".
@@ -117,6 +853,51 @@ def clone_dump_keyspace(
         Location of temporary folder to store intermediate files, must be
         specified if ``bundle`` is not `None`or when ``destination`` is a
         remote URL; ignored otherwise.
+    transfer_jobs : `int`
+        Number of concurrent file transfers to a remote destination.
+    transfer_retries : `int`
+        Number of retries for each failed file transfer.
+    transfer_bandwidth : `float` or `None`
+        Limit on aggregate transfer rate to a remote destination in MiB per
+        second, `None` for unlimited rate.
+    resume : `bool`
+        If `True` then continue previously interrupted dump to the same
+        destination, files which were completely dumped are not dumped again.
+        Cannot be used with ``bundle``.
+    engine : `str`, optional
+        Engine for reading table data, "dsbulk" runs dsbulk process for each
+        table or shard, "native" reads data with concurrent paged queries in
+        this process. Both produce the same output format, "native" does not
+        support tables with some column types, e.g. tuples or user-defined
+        types.
+    file_format : `str`, optional
+        Format of data files, "csv", "parquet", or "arrow" (Arrow IPC).
+        Columnar formats store values with their types, they need `pyarrow`
+        package and use internal compression selected by ``codec``.
+    small_table_size : `float` or `None`, optional
+        With "dsbulk" engine, tables with estimated size below this value in
+        MiB are dumped by "native" engine, avoiding dsbulk startup for each
+        small table. Size of a table is estimated for the whole cluster by
+        scaling the estimate for the token ranges of one node. Tables with
+        column types that native engine does not support are still dumped
+        by dsbulk. `None` disables this.
+    incremental : `str` or `None`, optional
+        Location of an earlier dump, folder or archive, to use as a base for
+        incremental dump. Time partitions that are older than the newest
+        partition in the base dump and whose schema did not change are not
+        dumped, the new dump refers to their data in the base dump, or in the
+        dumps that the base dump refers to. `None` makes a complete dump.
+    sample : `float` or `None`, optional
+        Fraction of the token ring to dump, between 0 and 1. Only partitions
+        whose tokens are in the same sub-range of the ring are dumped from
+        each sampled table, so tables with the same partition key contain the
+        same partitions. `None` dumps all data.
+    sample_patterns : `list` [`str`] or `None`, optional
+        List of patterns for the tables to be sampled, if empty or `None`
+        then all tables are sampled. Ignored if ``sample`` is `None`.
+    verify_resume : `bool`, optional
+        If `True` then on resume verify checksums of the files that were
+        already dumped by reading them, otherwise only their size is checked.
     """
     with ExitStack() as exit_stack:
         asyncio.run(
@@ -129,8 +910,23 @@ def clone_dump_keyspace(
                 password=password,
                 table_patterns=table_patterns,
                 jobs=jobs,
+                shards=shards,
+                shard_patterns=shard_patterns,
+                codec=codec,
+                codec_level=codec_level,
                 bundle=bundle,
                 tmp_dir=tmp_dir,
+                transfer_jobs=transfer_jobs,
+                transfer_retries=transfer_retries,
+                transfer_bandwidth=transfer_bandwidth * 1024 * 1024 if transfer_bandwidth else None,
+                resume=resume,
+                engine=engine,
+                file_format=file_format,
+                small_table_size=small_table_size * 1024 * 1024 if small_table_size is not None else None,
+                incremental=incremental,
+                sample=sample,
+                sample_patterns=sample_patterns or [],
+                verify_resume=verify_resume,
                 exit_stack=exit_stack,
             )
         )
@@ -148,7 +944,13 @@ def clone_load_keyspace(
     skip_existing_tables: bool,
     jobs: int,
     max_concurrent_queries: str | None,
+    prefetch: int,
+    log_dir: str | None,
+    resume: bool,
     dry_run: bool,
+    engine: Literal["dsbulk", "native"] = "dsbulk",
+    adaptive_concurrency: str | None = None,
+    small_table_size: float | None = None,
 ) -> None:
     """Load keyspace data from a specified directory.
 
@@ -157,7 +959,10 @@ def clone_load_keyspace(
     keyspace : `str`
         Keyspace name.
     folder : `str`
-        Folder name to load data from.
+        Local folder name or remote URL (e.g. S3) to load data from, remote
+        data is streamed without making a local copy. This can also be a
+        tar or zip archive made by `clone_dump_keyspace`, data is read from
+        the archive directly without unpacking it.
     hosts : `list` [`str`]
         Names of the hosts in the cluster.
     port : `int`
@@ -175,9 +980,35 @@ def clone_load_keyspace(
     jobs : `int`
         Number of concurrent jobs.
     max_concurrent_queries : `str` or `None`
-        Limit number of concurrent queries.
+        Limit number of concurrent queries for each data file.
+    prefetch : `int`
+        Number of concurrent range requests for each remote data file.
+    log_dir : `str` or `None`
+        Directory for dsbulk log files and load journal, if `None` then
+        ``_dsbulk_log`` sub-directory of a local ``folder`` is used, or
+        ``dsbulk_log_<user>_<keyspace>`` directory in a system temporary
+        location for remote ``folder`` or archive.
+    resume : `bool`
+        If `True` then continue interrupted load, data files that are
+        recorded in the load journal as completely loaded are not loaded
+        again, existing tables are not re-created.
     dry_run : `bool`
         If `True` print actions but do not restore.
+    engine : `str`, optional
+        Engine for writing table data, "dsbulk" runs dsbulk process for each
+        data file, "native" inserts data with concurrent requests from this
+        process.
+    adaptive_concurrency : `str` or `None`, optional
+        Bounds for adaptive concurrency in "MIN:MAX" format, only for native
+        engine. If specified, total number of concurrent requests of all jobs
+        is adjusted based on observed latency and timeouts, and timed out
+        requests are retried. If `None`, each job uses a fixed number of
+        concurrent requests given by ``max_concurrent_queries``.
+    small_table_size : `float` or `None`, optional
+        With "dsbulk" engine, data files smaller than this value in MiB are
+        loaded by "native" engine, avoiding dsbulk startup for each small
+        file. Tables with column types that native engine does not support
+        are still loaded by dsbulk. `None` disables this.
     """
     asyncio.run(
         _load_keyspace(
@@ -191,7 +1022,111 @@ def clone_load_keyspace(
             skip_existing_tables=skip_existing_tables,
             jobs=jobs,
             max_concurrent_queries=max_concurrent_queries,
+            prefetch=prefetch,
+            log_dir=log_dir,
+            resume=resume,
             dry_run=dry_run,
+            engine=engine,
+            adaptive_concurrency=adaptive_concurrency,
+            small_table_size=small_table_size * 1024 * 1024 if small_table_size is not None else None,
+        )
+    )
+
+
+def clone_copy_keyspace(
+    *,
+    keyspace: str,
+    hosts: list[str],
+    port: int,
+    username: str | None,
+    password: str | None,
+    dest_hosts: list[str],
+    dest_keyspace: str | None,
+    dest_port: int | None,
+    dest_username: str | None,
+    dest_password: str | None,
+    table_patterns: list[str],
+    skip_existing_tables: bool,
+    jobs: int,
+    shards: int,
+    shard_patterns: list[str],
+    max_concurrent_queries: str | None,
+    log_dir: str | None,
+) -> None:
+    """Copy keyspace data directly from one cluster to another.
+
+    Parameters
+    ----------
+    keyspace : `str`
+        Keyspace name in source cluster.
+    hosts : `list` [`str`]
+        Names of the hosts in source cluster.
+    port : `int`
+        CQL port number of source cluster.
+    username : `str` or `None`
+        Cassandra user name for source cluster.
+    password : `str` or `None`
+        Cassandra password for source cluster.
+    dest_hosts : `list` [`str`]
+        Names of the hosts in destination cluster.
+    dest_keyspace : `str` or `None`
+        Keyspace name in destination cluster, if `None` then the same as
+        ``keyspace``. Keyspace has to exist in destination cluster.
+    dest_port : `int` or `None`
+        CQL port number of destination cluster, if `None` then the same as
+        ``port``.
+    dest_username : `str` or `None`
+        Cassandra user name for destination cluster, if `None` then the same
+        as ``username``.
+    dest_password : `str` or `None`
+        Cassandra password for destination cluster, if `None` then the same
+        as ``password``.
+    table_patterns : `list` [`str`]
+        List of patterns, tables will be copied if they match one of the
+        patterns, if empty then all tables will be copied.
+    skip_existing_tables : `bool`
+        If `True` then copying will be skipped for the tables that already
+        exist in destination keyspace.
+    jobs : `int`
+        Number of concurrent jobs.
+    shards : `int`
+        Number of token-range shards for each table, each shard is copied by
+        a separate job.
+    shard_patterns : `list` [`str`]
+        List of patterns for tables that are split into shards, if empty then
+        all tables are split.
+    max_concurrent_queries : `str` or `None`
+        Limit number of concurrent queries for loading each table or shard.
+    log_dir : `str` or `None`
+        Directory for dsbulk log files and run report, if `None` then
+        ``dsbulk_log_<user>_<keyspace>`` directory in a system temporary
+        location is used.
+
+    Notes
+    -----
+    Data is not written to disk, output of dsbulk unload from source cluster
+    is streamed into dsbulk load to destination cluster through a small
+    in-memory buffer, so both clusters are busy at the same time.
+    """
+    asyncio.run(
+        _copy_keyspace(
+            keyspace=keyspace,
+            hosts=hosts,
+            port=port,
+            username=username,
+            password=password,
+            dest_hosts=dest_hosts,
+            dest_keyspace=dest_keyspace if dest_keyspace is not None else keyspace,
+            dest_port=dest_port if dest_port is not None else port,
+            dest_username=dest_username if dest_username is not None else username,
+            dest_password=dest_password if dest_password is not None else password,
+            table_patterns=table_patterns,
+            skip_existing_tables=skip_existing_tables,
+            jobs=jobs,
+            shards=shards,
+            shard_patterns=shard_patterns,
+            max_concurrent_queries=max_concurrent_queries,
+            log_dir=log_dir,
         )
     )
 
@@ -221,12 +1156,44 @@ async def _dump_keyspace(
     password: str | None,
     table_patterns: list[str],
     jobs: int,
+    shards: int,
+    shard_patterns: list[str],
+    codec: str,
+    codec_level: int | None,
     bundle: Literal["tar", "zip"] | None,
     tmp_dir: str | None,
+    transfer_jobs: int,
+    transfer_retries: int,
+    transfer_bandwidth: float | None,
+    resume: bool,
+    engine: Literal["dsbulk", "native"],
+    file_format: Literal["csv", "parquet", "arrow"],
+    small_table_size: float | None,
+    incremental: str | None,
+    sample: float | None,
+    sample_patterns: list[str],
+    verify_resume: bool,
     exit_stack: ExitStack,
 ) -> None:
+    if engine not in ("dsbulk", "native"):
+        raise ValueError(f"Unexpected dump engine: {engine}.")
     # Need dsbulk, check that it can be found.
-    _check_dsbulk()
+    if engine == "dsbulk":
+        _check_dsbulk()
+
+    if shards < 1:
+        raise ValueError(f"Number of shards must be positive: {shards}.")
+    sample_range: tuple[int, int] | None = None
+    if sample is not None:
+        if not 0 < sample <= 1:
+            raise ValueError(f"Sample fraction must be between 0 and 1: {sample}.")
+        if incremental is not None:
+            raise ValueError("Sampled dump cannot be incremental.")
+        sample_range = _sample_token_range(sample)
+        if shards > sample_range[1] - sample_range[0]:
+            raise ValueError(f"Number of shards {shards} is larger than the number of sampled tokens.")
+    _check_format(file_format, codec)
+    _CODECS[codec].check_level(codec_level)
 
     # Validate bundle mode destination path.
     dst_resource = ResourcePath(destination)
@@ -244,6 +1211,21 @@ async def _dump_keyspace(
     else:
         if not dst_resource.isdir():
             raise ValueError(f"Destination {dst_resource!r} must be a directory.")
+    if resume and bundle is not None:
+        raise ValueError("Resuming dump is not supported for bundles.")
+
+    # Schema and data locations of the base for incremental dump.
+    base_schema: dict[str, str] = {}
+    base_files: dict[str, tuple[str, list[str]]] = {}
+    base_url: str | None = None
+    if incremental is not None:
+        base = _DumpSource(incremental)
+        base_url = base.location.geturl()
+        if base_url.rstrip("/") == dst_resource.geturl().rstrip("/"):
+            raise ValueError("Destination of incremental dump cannot be the same as its base.")
+        if base.exists(_SAMPLE):
+            raise ValueError(f"Base dump {incremental} is sampled, it cannot be used for incremental dump.")
+        base_schema, base_files = _base_dump_files(base)
 
     # Make a temporary folder from which we can copy/transfer files.
     if bundle is not None or not dst_resource.isLocal:
@@ -261,144 +1243,837 @@ async def _dump_keyspace(
     dsbulk_logs.mkdir()
     manifest: list[str] = []
 
-    # Get schema for all tables to be dumped.
-    schema = _table_schema(keyspace, hosts, port, username, password, table_patterns)
+    with _make_cluster(hosts, port, username, password) as cluster:
+        with cluster.connect() as session:
+            # Get schema for all tables to be dumped.
+            schema = await _table_schema(session, keyspace, table_patterns)
+
+            # Find partition keys for the tables that need sharding or
+            # sampling, both select token ranges.
+            partition_keys: dict[str, list[str]] = {}
+            is_murmur3 = (cluster.metadata.partitioner or "").endswith("Murmur3Partitioner")
+            sharded_tables: list[str] = []
+            sampled_tables: list[str] = []
+            if shards > 1:
+                sharded_tables = _match_tables(schema, shard_patterns) if shard_patterns else sorted(schema)
+            if sample is not None:
+                sampled_tables = _match_tables(schema, sample_patterns) if sample_patterns else sorted(schema)
+            if sharded_tables or sampled_tables:
+                if not is_murmur3:
+                    raise ValueError(
+                        "Sharding and sampling are only supported for Murmur3Partitioner, "
+                        f"cluster uses {cluster.metadata.partitioner!r}."
+                    )
+                partition_keys = _partition_keys(
+                    session, keyspace, sorted({*sharded_tables, *sampled_tables})
+                )
+            # Token range selects the same partitions only in tables with the
+            # same partition key columns.
+            sample_keys: dict[tuple[str, ...], list[str]] = {}
+            for table in sampled_tables:
+                sample_keys.setdefault(tuple(partition_keys[table]), []).append(table)
+            if len(sample_keys) > 1:
+                _LOG.warning(
+                    "Sampled tables have different partition keys, their samples contain unrelated "
+                    "partitions: %s",
+                    "; ".join(
+                        f"({', '.join(key)}): {', '.join(tables)}" for key, tables in sample_keys.items()
+                    ),
+                )
+
+            # Estimated table sizes are used for scheduling.
+            table_sizes = _table_size_estimates(session, keyspace)
+
+            # Tables whose data is taken from the base dump are not dumped.
+            carried_tables = _carried_tables(schema, base_schema, base_files)
+            if incremental is not None:
+                _LOG.info(
+                    "Incremental dump, %d of %d tables are taken from earlier dumps",
+                    len(carried_tables),
+                    len(schema),
+                )
+
+            # Tables dumped by native engine, small tables do not need a
+            # separate dsbulk process.
+            native_tables: set[str] = set()
+            if engine == "native":
+                native_tables = set(schema)
+            elif small_table_size is not None:
+                native_tables = {table for table in schema if table_sizes.get(table, 0) < small_table_size}
+            if native_tables:
+                # Native engine only writes values of supported column types
+                # in the same format as dsbulk. Small tables with other types
+                # are dumped by dsbulk.
+                native_types = _column_types(session, keyspace, sorted(native_tables))
+                unsupported = sorted(
+                    table for table in native_tables if not _native_types_supported(native_types[table])
+                )
+                if engine == "native" and unsupported:
+                    raise ValueError(
+                        f"Tables {', '.join(unsupported)} have column types not supported by native "
+                        "engine, use dsbulk engine."
+                    )
+                native_tables.difference_update(unsupported)
+            if engine != "native" and small_table_size is not None:
+                _LOG.info("%d small tables will be dumped by native engine", len(native_tables))
+
+            # Native engine needs all columns, and splits every table into
+            # token ranges for concurrent queries.
+            table_columns: dict[str, list[str]] = {}
+            token_keys: dict[str, list[str]] = {}
+            if native_tables or file_format != "csv":
+                table_columns = _table_columns(session, keyspace, sorted(schema))
+            if native_tables and is_murmur3:
+                token_keys = _partition_keys(session, keyspace, sorted(native_tables))
+
+            # Columnar files are typed, types are in the order of columns.
+            column_types: dict[str, dict[str, str]] = {}
+            if file_format != "csv":
+                all_types = _column_types(session, keyspace, sorted(schema))
+                column_types = {
+                    table: {column: all_types[table][column] for column in columns}
+                    for table, columns in table_columns.items()
+                }
+
     with open(dump_location.join("schema.json").ospath, "w") as out:
         json.dump(schema, out)
     manifest.append("schema.json")
 
-    t0 = time.time()
+    # Incremental dump records where data of carried tables is, and the
+    # newest partitions of the base dump for information.
+    if base_url is not None:
+        carried_files: dict[str, list[str]] = {}
+        for table in sorted(carried_tables):
+            location, file_names = base_files[table]
+            carried_files.setdefault(location, []).extend(file_names)
+        incremental_info = {
+            "version": 1,
+            "base": base_url,
+            "watermarks": _newest_partitions(base_schema),
+            "files": carried_files,
+        }
+        with open(dump_location.join(_INCREMENTAL).ospath, "w") as out:
+            json.dump(incremental_info, out, indent=1)
+        manifest.append(_INCREMENTAL)
+
+    # Sampled dump records what was sampled, so that it is not mistaken for
+    # a complete dump.
+    if sample_range is not None:
+        sample_info = {
+            "version": 1,
+            "fraction": sample,
+            "token_range": sample_range,
+            "tables": sampled_tables,
+        }
+        with open(dump_location.join(_SAMPLE).ospath, "w") as out:
+            json.dump(sample_info, out, indent=1)
+        manifest.append(_SAMPLE)
+        _LOG.info(
+            "Sampled dump, %d tables are limited to token range (%d, %d]", len(sampled_tables), *sample_range
+        )
+
+    # Make the list of files to dump, sharded tables produce multiple files,
+    # sampled tables dump a part of the token ring.
+    data_file_sizes: list[tuple[_DataFile, int]] = []
+    for table in sorted(schema):
+        if table in carried_tables:
+            continue
+        table_size = table_sizes.get(table, 0)
+        token_range: tuple[int, int] | None = None
+        if sample is not None and table in sampled_tables:
+            token_range = sample_range
+            table_size = int(table_size * sample)
+        if table in sharded_tables:
+            for shard, shard_range in enumerate(
+                _split_token_range(shards, token_range or (_MIN_TOKEN, _MAX_TOKEN))
+            ):
+                data_file_sizes.append(
+                    (
+                        _DataFile(table, shard, shard_range, codec=codec, file_format=file_format),
+                        table_size // shards,
+                    )
+                )
+        else:
+            data_file_sizes.append(
+                (_DataFile(table, None, token_range, codec=codec, file_format=file_format), table_size)
+            )
+
+    # Journal keeps track of completed files in destination directory.
+    journal: _DumpJournal | None = None
+    file_infos: dict[str, _FileInfo] = {}
+    if bundle is None:
+        journal = _DumpJournal(dst_resource)
+        # Existing manifest would mark incomplete dump as complete.
+        if (manifest_path := dst_resource.join("manifest.txt")).exists():
+            manifest_path.remove()
+        if resume:
+            file_infos = await _completed_files(
+                journal,
+                dst_resource,
+                [df for df, _ in data_file_sizes],
+                jobs=transfer_jobs,
+                verify_checksum=verify_resume,
+            )
+            _LOG.info("Resuming dump, %d files were dumped already", len(file_infos))
+            manifest += sorted(file_infos)
+            data_file_sizes = [item for item in data_file_sizes if item[0].file_name not in file_infos]
+        else:
+            journal.clear()
 
-    tables = sorted(schema)
     n_tasks = max(jobs, 1)
-    tasks: list[asyncio.Task] = []
-    exceptions = []
-    while True:
-        while tables and len(tasks) < n_tasks:
-            task = asyncio.create_task(
-                _dump_table(
-                    host=hosts[0],
-                    port=port,
-                    keyspace=keyspace,
-                    table=tables.pop(0),
-                    destination=dump_location.ospath,
-                    username=username,
-                    password=password,
+    data_files = _schedule_jobs(data_file_sizes, n_tasks)
+
+    t0 = time.time()
+
+    progress = _Progress("dump", keyspace)
+    file_progress = {data_file: progress.add(data_file, size) for data_file, size in data_file_sizes}
+
+    def _journal_uploaded(file_name: str) -> None:
+        # Schema and logs are not in the journal.
+        if journal is not None and file_name in file_infos:
+            journal.add(file_infos[file_name])
+
+    # Files are passed to an output stage as soon as they are dumped, which
+    # uploads them to remote destination or adds them to an archive. This
+    # overlaps output with dumping and frees local space early.
+    output_queue: asyncio.Queue[str | None] = asyncio.Queue()
+    with ExitStack() as output_stack:
+        output_task: asyncio.Task | None = None
+        bundle_writer: _BundleWriter | None = None
+        if bundle is not None:
+            bundle_writer = output_stack.enter_context(_open_bundle(bundle, dst_resource, dump_location))
+            output_task = asyncio.create_task(_bundle_files(output_queue, dump_location, bundle_writer))
+        elif not dst_resource.isLocal:
+            output_task = asyncio.create_task(
+                _upload_files(
+                    output_queue,
+                    dump_location,
+                    dst_resource,
+                    jobs=transfer_jobs,
+                    retries=transfer_retries,
+                    bandwidth=transfer_bandwidth,
+                    on_uploaded=_journal_uploaded,
                 )
             )
-            tasks.append(task)
-        if not tasks:
-            break
-        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
-        tasks = list(pending)
-        for task in done:
-            if exc := task.exception():
-                exceptions.append(exc)
-            else:
-                file_name = await task
-                manifest.append(file_name)
+        output_queue.put_nowait("schema.json")
+        if base_url is not None:
+            output_queue.put_nowait(_INCREMENTAL)
+        if sample_range is not None:
+            output_queue.put_nowait(_SAMPLE)
 
-    if exceptions:
-        raise BaseExceptionGroup("One or more operations failed", exceptions)
+        native_session: Session | None = None
+        if native_tables:
+            # Single driver session is shared by all dump jobs.
+            native_cluster = output_stack.enter_context(_make_cluster(hosts, port, username, password))
+            native_session = output_stack.enter_context(native_cluster.connect())
 
-    # Finally write manifest, it is a marker that dump is complete.
-    with open(dump_location.join("manifest.txt").ospath, "w") as out:
-        for name in sorted(manifest):
-            print(name, file=out)
+        monitor_task = asyncio.create_task(progress.monitor())
+        output_stack.callback(monitor_task.cancel)
 
-    t1 = time.time()
+        # Each dsbulk job uses its own coordinator node, to spread the load
+        # across the cluster.
+        coordinators = itertools.cycle(hosts)
 
-    _LOG.info("Total time for dump: %.2f sec", t1 - t0)
+        tasks: list[asyncio.Task] = []
+        task_files: dict[asyncio.Task, _DataFile] = {}
+        exceptions = []
+        while True:
+            if output_task is not None and output_task.done() and output_task.exception() is not None:
+                # Output failed, no point in dumping more tables.
+                data_files = []
+            while data_files and len(tasks) < n_tasks:
+                data_file = data_files.pop(0)
+                if native_session is not None and data_file.table in native_tables:
+                    coro = _dump_table_native(
+                        session=native_session,
+                        keyspace=keyspace,
+                        data_file=data_file,
+                        columns=table_columns[data_file.table],
+                        partition_key=token_keys.get(data_file.table, []),
+                        codec_level=codec_level,
+                        destination=dump_location.ospath,
+                        column_types=column_types.get(data_file.table),
+                        progress=file_progress[data_file],
+                    )
+                else:
+                    coro = _dump_table(
+                        host=next(coordinators),
+                        port=port,
+                        keyspace=keyspace,
+                        data_file=data_file,
+                        partition_key=partition_keys.get(data_file.table, []),
+                        codec_level=codec_level,
+                        destination=dump_location.ospath,
+                        username=username,
+                        password=password,
+                        column_types=column_types.get(data_file.table),
+                        progress=file_progress[data_file],
+                    )
+                file_progress[data_file].started()
+                task = asyncio.create_task(coro)
+                tasks.append(task)
+                task_files[task] = data_file
+            if not tasks:
+                break
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            tasks = list(pending)
+            for task in done:
+                file_progress[task_files.pop(task)].finished(task.exception())
+                if exc := task.exception():
+                    exceptions.append(exc)
+                else:
+                    file_info = await task
+                    manifest.append(file_info.name)
+                    file_infos[file_info.name] = file_info
+                    if output_task is None and journal is not None:
+                        # File is already in its final location.
+                        await asyncio.to_thread(journal.add, file_info)
+                    output_queue.put_nowait(file_info.name)
 
-    if bundle is not None:
-        local_bundle_path = dst_resource
-        if not dst_resource.isLocal:
-            local_bundle_path = dump_location.join(dst_resource.basename())
+        if output_task is not None:
+            # Wait until all dumped files are processed.
+            if not exceptions:
+                output_queue.put_nowait(_DSBULK_LOG)
+            output_queue.put_nowait(None)
+            try:
+                await output_task
+            except Exception as exc:
+                exceptions.append(exc)
 
-        if bundle == "tar":
-            _make_tarball(dump_location, manifest, local_bundle_path)
-        elif bundle == "zip":
-            _make_zip(dump_location, manifest, local_bundle_path)
-        else:
-            raise ValueError(f"Unexpected bundle type {bundle}")
+        progress.log()
+
+        # Run report with per-table timings is saved with the manifest, and
+        # it is listed in the manifest. Report of a failed dump is saved to
+        # the destination folder, or next to the archive, which is removed.
+        report_path = dump_location.join(_REPORT)
+        progress.write_report(report_path.ospath)
+        if exceptions:
+            failure_report: ResourcePath | None = None
+            if bundle is not None:
+                failure_report = dst_resource.updatedFile(f"{dst_resource.basename()}.{_REPORT}")
+            elif not dst_resource.isLocal:
+                failure_report = dst_resource.join(_REPORT)
+            if failure_report is not None:
+                try:
+                    await asyncio.to_thread(
+                        failure_report.transfer_from, report_path, transfer="copy", overwrite=True
+                    )
+                except Exception as exc:
+                    _LOG.warning("Failed to save run report to %s: %s", failure_report, exc)
+            raise BaseExceptionGroup("One or more operations failed", exceptions)
+        manifest.append(_REPORT)
 
-        if local_bundle_path != dst_resource:
-            _LOG.info("Transferring bundle to %s", dst_resource)
-            dst_resource.transfer_from(local_bundle_path, transfer="move")
+        # Metadata for data files is in a separate file, plain manifest
+        # format is kept compatible with older versions.
+        with open(dump_location.join("manifest.json").ospath, "w") as out:
+            out.write(_manifest_metadata(file_infos.values()))
+        manifest.append("manifest.json")
 
-    elif not dst_resource.isLocal:
-        # Transfer individual files to remote.
-        _LOG.info("Transferring files to %s", dst_resource)
-        for local_path in _walk_files(dump_location):
-            rel_path = local_path.relative_to(dump_location)
-            assert rel_path is not None, "must be relative"
-            remote_path = dst_resource.join(rel_path)
-            remote_path.transfer_from(local_path, transfer="move")
+        # Finally write manifest, it is a marker that dump is complete, so it
+        # has to be output after everything else.
+        with open(dump_location.join("manifest.txt").ospath, "w") as out:
+            for name in sorted(manifest):
+                print(name, file=out)
+        for file_name in (_REPORT, "manifest.json", "manifest.txt"):
+            manifest_path = dump_location.join(file_name)
+            if bundle_writer is not None:
+                await asyncio.to_thread(bundle_writer.add, manifest_path.ospath, file_name)
+            elif not dst_resource.isLocal:
+                remote_path = dst_resource.join(file_name)
+                await asyncio.to_thread(
+                    remote_path.transfer_from, manifest_path, transfer="move", overwrite=True
+                )
+        # Journal is not needed in a complete dump.
+        if journal is not None:
+            await asyncio.to_thread(journal.remove)
 
+    t1 = time.time()
 
-async def _dump_table(
+    _LOG.info("Total time for dump: %.2f sec", t1 - t0)
+
+
+async def _upload_files(
+    queue: asyncio.Queue[str | None],
+    local_dir: ResourcePath,
+    destination: ResourcePath,
     *,
-    host: str,
+    jobs: int,
+    retries: int,
+    bandwidth: float | None,
+    on_uploaded: Callable[[str], None] | None = None,
+) -> None:
+    """Move files or directories from local directory to a remote destination
+    as their names appear in the queue, `None` in the queue stops uploading.
+
+    Parameters
+    ----------
+    queue : `asyncio.Queue`
+        Queue with the names of files or directories relative to
+        ``local_dir``.
+    local_dir : `lsst.resources.ResourcePath`
+        Local directory containing files to upload.
+    destination : `lsst.resources.ResourcePath`
+        Remote destination directory.
+    jobs : `int`
+        Number of concurrent transfers.
+    retries : `int`
+        Number of retries for each failed transfer.
+    bandwidth : `float` or `None`
+        Limit on aggregate transfer rate in bytes per second, `None` for
+        unlimited rate.
+    on_uploaded : `~collections.abc.Callable` or `None`
+        Function called with the name from the queue after it is uploaded.
+    """
+    limiter = _RateLimiter(bandwidth) if bandwidth else None
+
+    async def _worker() -> None:
+        while (file_name := await queue.get()) is not None:
+            local_path = local_dir.join(file_name)
+            if os.path.isdir(local_path.ospath):
+                local_paths = list(_walk_files(local_dir.join(file_name, forceDirectory=True)))
+            else:
+                local_paths = [local_path]
+            _LOG.info("Transferring %s to %s", file_name, destination)
+            for local_path in local_paths:
+                rel_path = local_path.relative_to(local_dir)
+                assert rel_path is not None, "must be relative"
+                await _transfer_file(local_path, destination.join(rel_path), retries, limiter)
+            if on_uploaded is not None:
+                await asyncio.to_thread(on_uploaded, file_name)
+        # Let other workers see the end of the queue too.
+        queue.put_nowait(None)
+
+    async with asyncio.TaskGroup() as group:
+        for _ in range(max(jobs, 1)):
+            group.create_task(_worker())
+
+
+async def _completed_files(
+    journal: _DumpJournal,
+    destination: ResourcePath,
+    data_files: list[_DataFile],
+    *,
+    jobs: int,
+    verify_checksum: bool,
+) -> dict[str, _FileInfo]:
+    """Return information for the data files that were completely dumped
+    by a previous run, verifying that they exist and have expected size,
+    and optionally CRC32 checksum.
+
+    Parameters
+    ----------
+    journal : `_DumpJournal`
+        Journal of the dump.
+    destination : `lsst.resources.ResourcePath`
+        Dump destination directory.
+    data_files : `list` [`_DataFile`]
+        Data files of the dump.
+    jobs : `int`
+        Maximum number of files verified concurrently.
+    verify_checksum : `bool`
+        If `True` then read each file to verify its checksum, files with
+        unexpected size are not read. For remote destination this downloads
+        all dumped files.
+    """
+    records = await asyncio.to_thread(journal.read)
+    candidates = [records[data_file.file_name] for data_file in data_files if data_file.file_name in records]
+    semaphore = asyncio.Semaphore(max(jobs, 1))
+
+    def _verify(info: _FileInfo) -> bool:
+        path = destination.join(info.name)
+        if path.exists() and path.size() == info.size:
+            if not verify_checksum:
+                return True
+            counter = _ByteCounter()
+            with path.open("rb") as file:
+                while data := file.read(_READ_CHUNK_SIZE):
+                    counter.update(data)
+            if counter.hexdigest == info.crc32:
+                return True
+        _LOG.warning("File %s is missing or does not match its journal record, will dump it again", path)
+        return False
+
+    async def _verify_limited(info: _FileInfo) -> bool:
+        async with semaphore:
+            return await asyncio.to_thread(_verify, info)
+
+    verified = await asyncio.gather(*[_verify_limited(info) for info in candidates])
+    return {info.name: info for info, ok in zip(candidates, verified) if ok}
+
+
+async def _transfer_file(
+    local_path: ResourcePath, remote_path: ResourcePath, retries: int, limiter: _RateLimiter | None
+) -> None:
+    """Move one file to a remote location, retrying on failures."""
+    size = os.stat(local_path.ospath).st_size
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            await limiter.acquire(size)
+        try:
+            await asyncio.to_thread(remote_path.transfer_from, local_path, transfer="move", overwrite=True)
+            return
+        except Exception as exc:
+            if attempt == retries:
+                raise
+            delay = 2.0**attempt
+            _LOG.warning("Transfer of %s failed, will retry in %.0f sec: %s", local_path, delay, exc)
+            await asyncio.sleep(delay)
+
+
+class _RateLimiter:
+    """Limiter for aggregate data transfer rate.
+
+    Parameters
+    ----------
+    rate : `float`
+        Maximum rate in bytes per second.
+
+    Notes
+    -----
+    Transfers are opaque, so the rate is limited on average by delaying start
+    of each transfer until the time slot reserved by previous transfers is
+    over. Each transfer reserves a slot proportional to its size.
+    """
+
+    def __init__(self, rate: float):
+        self._rate = rate
+        self._next = time.monotonic()
+
+    async def acquire(self, size: int) -> None:
+        """Wait until transfer of ``size`` bytes can start."""
+        now = time.monotonic()
+        start = max(now, self._next)
+        self._next = start + size / self._rate
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+async def _bundle_files(
+    queue: asyncio.Queue[str | None], local_dir: ResourcePath, writer: _BundleWriter
+) -> None:
+    """Add files or directories from local directory to an archive as their
+    names appear in the queue, `None` in the queue stops archiving.
+    """
+    while (file_name := await queue.get()) is not None:
+        local_path = local_dir.join(file_name)
+        _LOG.info("Adding %s to archive", file_name)
+        await asyncio.to_thread(writer.add, local_path.ospath, file_name)
+        # Delete file after adding it to archive, could avoid running out of
+        # disk space on large backups. We do not care to remove dsbulk logs
+        # as they are small and will be removed when tmp directory is
+        # removed.
+        if file_name != _DSBULK_LOG:
+            local_path.remove()
+
+
+async def _dump_table(
+    *,
+    host: str,
     port: int,
     keyspace: str,
-    table: str,
+    data_file: _DataFile,
+    partition_key: list[str],
+    codec_level: int | None,
     destination: str,
     username: str | None,
     password: str | None,
-) -> str:
-    """Dump table contents as CSV file."""
-    output_file = f"{table}.csv.gz"
+    column_types: dict[str, str] | None = None,
+    progress: _FileProgress | None = None,
+) -> _FileInfo:
+    """Dump table contents, or one token-range shard of the table, as CSV
+    or columnar file.
+
+    Column types are only needed for columnar files.
+    """
+    table = data_file.table
+    output_file = data_file.file_name
     output_path = os.path.join(destination, output_file)
     log_dir = os.path.join(destination, _DSBULK_LOG)
     os.makedirs(log_dir, exist_ok=True)
 
-    # Command to dump table data in CSV format to stdout.
-    cmd = [
-        "dsbulk",
-        "unload",
-        "-h",
-        f'["{host}"]',
-        "-port",
-        str(port),
-        "-k",
-        keyspace,
-        "-t",
-        table,
-        "-logDir",
-        log_dir,
-        "--log.verbosity",
-        "quiet",
-    ]
-    if username:
-        cmd += ["-u", username]
-    if password:
-        cmd += ["-p", password, "--driver.advanced.auth-provider.class=PlainTextAuthProvider"]
+    cmd = _dsbulk_unload_command(host, port, keyspace, data_file, partition_key, log_dir, username, password)
 
-    # In dsbulk compression with output to stdout does not work, it crashes
-    # and/or makes corrupted file. Instead do usual pipe from uncompressed
-    # stream to gzip.
-    fd = None
     _LOG.info("Dumping table %s to file %s", table, output_path)
     try:
-        fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_DIRECT)
-        file_obj = os.fdopen(fd, "wb")
+        file_obj = open(output_path, "wb")
     except Exception as exc:
         raise RuntimeError(f"Failed to open output file: {exc}") from exc
     try:
-        shell_cmd = shlex.join(cmd) + " | gzip -9"
-        dsbulk = await asyncio.create_subprocess_shell(
-            shell_cmd, stdin=asyncio.subprocess.DEVNULL, stdout=file_obj
-        )
-        returncode = await dsbulk.wait()
-        if returncode != 0:
-            raise RuntimeError(f"Failed to execute dsbulk for table {table}: return code = {returncode}")
+        with file_obj:
+            file_info = await _write_data_file(
+                file_obj,
+                data_file,
+                [cmd],
+                codec_level=codec_level,
+                column_types=column_types,
+                progress=progress,
+            )
     except Exception as exc:
         raise RuntimeError(f"Failed to execute dsbulk unload for table {table}: {exc}") from exc
+
+    _LOG.info("Finished dumping table %s to file %s, %d rows", table, output_file, file_info.rows)
+    return file_info
+
+
+async def _dump_table_native(
+    *,
+    session: Session,
+    keyspace: str,
+    data_file: _DataFile,
+    columns: list[str],
+    partition_key: list[str],
+    codec_level: int | None,
+    destination: str,
+    column_types: dict[str, str] | None = None,
+    progress: _FileProgress | None = None,
+) -> _FileInfo:
+    """Dump table contents, or one token-range shard of the table, as CSV
+    or columnar file using concurrent paged queries instead of dsbulk.
+
+    Output has the same format as the output of dsbulk. If ``partition_key``
+    is empty then the whole table is read with one query, this is only
+    possible for un-sharded tables. Column types are only needed for
+    columnar files.
+    """
+    table = data_file.table
+    output_file = data_file.file_name
+    output_path = os.path.join(destination, output_file)
+
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    query = f'SELECT {column_list} FROM "{keyspace}"."{table}"'
+    token_ranges: list[tuple[int, int] | None] = [None]
+    if partition_key:
+        token = "token(" + ", ".join(f'"{column}"' for column in partition_key) + ")"
+        query += f" WHERE {token} > ? AND {token} <= ?"
+        # Narrow shard may have fewer tokens than the number of splits.
+        start, end = data_file.token_range or (_MIN_TOKEN, _MAX_TOKEN)
+        token_ranges = list(_split_token_range(min(_NATIVE_SPLITS, end - start), (start, end)))
+    elif data_file.token_range is not None:
+        raise ValueError(f"Partition key is needed to dump shard of a table {table}.")
+
+    _LOG.info("Dumping table %s to file %s", table, output_path)
+    try:
+        file_obj = open(output_path, "wb")
+    except Exception as exc:
+        raise RuntimeError(f"Failed to open output file: {exc}") from exc
+    try:
+        statement = await asyncio.to_thread(session.prepare, query)
+        chunks = _native_csv_chunks(session, statement, token_ranges, columns)
+        with file_obj:
+            async with aclosing(chunks):
+                file_info = await _write_data_file(
+                    file_obj,
+                    data_file,
+                    [],
+                    source=chunks,
+                    codec_level=codec_level,
+                    column_types=column_types,
+                    progress=progress,
+                )
+    except Exception as exc:
+        raise RuntimeError(f"Failed to execute native unload for table {table}: {exc}") from exc
+
+    _LOG.info("Finished dumping table %s to file %s, %d rows", table, output_file, file_info.rows)
+    return file_info
+
+
+async def _write_data_file(
+    file_obj: BinaryIO,
+    data_file: _DataFile,
+    commands: list[list[str]],
+    *,
+    source: AsyncIterator[bytes] | None = None,
+    codec_level: int | None,
+    column_types: dict[str, str] | None,
+    progress: _FileProgress | None = None,
+) -> _FileInfo:
+    """Run commands producing CSV data and write their output to a data
+    file, compressing or converting it to columnar format.
+
+    Parameters
+    ----------
+    file_obj : `typing.BinaryIO`
+        Output file.
+    data_file : `_DataFile`
+        Description of the data file.
+    commands : `list` [`list` [`str`]]
+        Commands producing CSV data, can be empty if ``source`` is given.
+    source : `~collections.abc.AsyncIterator` [`bytes`], optional
+        Source of data for the first command.
+    codec_level : `int` or `None`
+        Compression level.
+    column_types : `dict` [`str`, `str`] or `None`
+        CQL types of all table columns, only needed for columnar format.
+    progress : `_FileProgress`, optional
+        Progress of the file, its counters are updated with the data.
+
+    Returns
+    -------
+    file_info : `_FileInfo`
+        Information about written file.
+    """
+    # In dsbulk compression with output to stdout does not work, it crashes
+    # and/or makes corrupted file. Instead pipe uncompressed stream to a
+    # compression tool. Both streams pass through this process to compute
+    # row count and checksum without reading the file again.
+    raw = progress.raw if progress is not None else _CsvCounter()
+    stored = progress.stored if progress is not None else _ByteCounter()
+    commands = list(commands)
+    observers: list[Callable[[bytes], None] | None] = [None] * len(commands)
+    codec = _CODECS[data_file.codec]
+    if data_file.file_format != "csv":
+        if column_types is None:
+            raise ValueError(f"Column types are needed to write {data_file.file_format} file.")
+        writer = _ColumnarWriter(
+            data_file.file_format,
+            _ObservedFile(file_obj, stored.update),
+            column_types,
+            codec.columnar,
+            codec_level,
+        )
+        observers.append(raw.update)
+        try:
+            await _run_pipeline(commands, source=source, sink=writer.feed, observers=observers)
+        except BaseException:
+            writer.abort()
+            raise
+        await writer.close()
+    else:
+        if compress_cmd := codec.compress_command(codec_level):
+            commands.append(compress_cmd)
+            observers += [raw.update, stored.update]
+        else:
+
+            def _update(data: bytes) -> None:
+                raw.update(data)
+                stored.update(data)
+
+            observers.append(_update)
+        block_writer = _BlockWriter(file_obj)
+        await _run_pipeline(commands, source=source, sink=block_writer.write, observers=observers)
+        await block_writer.flush()
+    return _FileInfo.from_counters(data_file.file_name, stored, raw)
+
+
+async def _native_csv_chunks(
+    session: Session,
+    statement: PreparedStatement,
+    token_ranges: list[tuple[int, int] | None],
+    columns: list[str],
+) -> AsyncGenerator[bytes]:
+    """Run a query for each token range concurrently and return the rows
+    as CSV data, in arbitrary order.
+
+    Header line is only produced if there are any rows, similarly to dsbulk.
+    """
+    queue: asyncio.Queue[bytes | Exception | None] = asyncio.Queue(maxsize=len(token_ranges))
+
+    async def _fetch(token_range: tuple[int, int] | None) -> None:
+        try:
+            async for rows in _paged_rows(session, statement.bind(token_range or ())):
+                if rows:
+                    await queue.put("".join([_csv_line(row) for row in rows]).encode())
+        except Exception as exc:
+            await queue.put(exc)
+        else:
+            await queue.put(None)
+
+    tasks = [asyncio.create_task(_fetch(token_range)) for token_range in token_ranges]
+    header = (",".join(columns) + "\n").encode()
+    try:
+        remaining = len(tasks)
+        while remaining:
+            item = await queue.get()
+            if item is None:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                if header:
+                    yield header
+                    header = b""
+                yield item
     finally:
-        file_obj.close()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _paged_rows(session: Session, statement: BoundStatement) -> AsyncGenerator[list]:
+    """Execute a statement asynchronously and return its result page by
+    page. Next page is only requested when the consumer asks for it.
+    """
+    loop = asyncio.get_running_loop()
+    pages: asyncio.Queue[tuple[list | None, BaseException | None]] = asyncio.Queue()
+    statement.fetch_size = _NATIVE_FETCH_SIZE
+    future = session.execute_async(statement, timeout=_NATIVE_TIMEOUT)
+    # Callbacks are called from driver threads, for every page.
+    future.add_callbacks(
+        callback=lambda rows: loop.call_soon_threadsafe(pages.put_nowait, (rows, None)),
+        errback=lambda exc: loop.call_soon_threadsafe(pages.put_nowait, (None, exc)),
+    )
+    while True:
+        rows, exc = await pages.get()
+        if exc is not None:
+            raise exc
+        yield rows or []
+        if not future.has_more_pages:
+            break
+        future.start_fetching_next_page()
+
+
+def _csv_line(values: Iterable[Any]) -> str:
+    """Format one row as a line of CSV."""
+    return ",".join([_csv_field(value) for value in values]) + "\n"
+
+
+def _csv_field(value: Any) -> str:
+    """Format a column value as a CSV field, `None` is an empty field, empty
+    string is quoted.
+    """
+    if value is None:
+        return ""
+    text = _csv_value(value)
+    if not text or _CSV_QUOTE_RE.search(text):
+        # Escape rule of `_CSV_ESCAPE_RE`, backslashes first.
+        return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return text
+
 
-    _LOG.info("Finished dumping table %s", table)
-    return output_file
+def _csv_value(value: Any) -> str:
+    """Convert a column value to a string in the format used by dsbulk."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "Infinity" if value > 0 else "-Infinity"
+        return repr(value)
+    if isinstance(value, datetime.datetime):
+        # Driver returns timestamps as naive UTC datetimes, with millisecond
+        # precision.
+        text = value.strftime("%Y-%m-%dT%H:%M:%S")
+        if value.microsecond:
+            text += f".{value.microsecond // 1000:03d}"
+        return text + "Z"
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode()
+    if isinstance(value, Mapping | list | tuple | set | frozenset | SortedSet):
+        # Collections are represented as JSON.
+        return json.dumps(_json_value(value))
+    return str(value)
+
+
+def _json_value(value: Any) -> Any:
+    """Convert a column value to a JSON-compatible object."""
+    if value is None or isinstance(value, bool | int | float | str):
+        return value
+    if isinstance(value, Mapping):
+        return {_csv_value(key): _json_value(item) for key, item in value.items()}
+    if isinstance(value, list | tuple | set | frozenset | SortedSet):
+        return [_json_value(item) for item in value]
+    return _csv_value(value)
 
 
 async def _load_keyspace(
@@ -413,28 +2088,90 @@ async def _load_keyspace(
     skip_existing_tables: bool,
     jobs: int,
     max_concurrent_queries: str | None,
+    prefetch: int,
+    log_dir: str | None,
+    resume: bool,
     dry_run: bool,
+    engine: Literal["dsbulk", "native"],
+    adaptive_concurrency: str | None,
+    small_table_size: float | None,
 ) -> None:
+    if engine not in ("dsbulk", "native"):
+        raise ValueError(f"Unexpected load engine: {engine}.")
     # Need dsbulk, check that it can be found.
-    _check_dsbulk()
+    if engine == "dsbulk":
+        _check_dsbulk()
+    native_concurrency = 0
+    if engine == "native" or small_table_size is not None:
+        native_concurrency = _native_concurrency(max_concurrent_queries)
+    # Adaptive limit is shared by all jobs.
+    shared_limiter: _ConcurrencyLimiter | None = None
+    if adaptive_concurrency is not None:
+        if engine != "native":
+            raise ValueError("Adaptive concurrency is only supported by native engine.")
+        shared_limiter = _ConcurrencyLimiter(*_adaptive_bounds(adaptive_concurrency))
 
-    # Check that folder is there.
-    if not os.path.isdir(folder):
-        raise ValueError(f"Folder {folder!r} does not exist or is not a directory.")
+    # Check that folder or archive is there.
+    source = _DumpSource(folder)
 
     # Check manifest.
-    manifest_path = os.path.join(folder, "manifest.txt")
-    if not os.path.isfile(manifest_path):
-        raise ValueError(f"Manifest file {manifest_path!r} does not exist, dump may be incomplete.")
+    if not source.exists("manifest.txt"):
+        raise ValueError(f"Manifest file does not exist in {folder}, dump may be incomplete.")
+
+    # Find all data files, there may be more than one file per table.
+    manifest = [line.strip() for line in source.read("manifest.txt").decode().splitlines() if line.strip()]
+    table_files = _manifest_data_files(manifest)
+
+    # Metadata for data files, dumps made by older versions do not have it.
+    file_infos: dict[str, _FileInfo] = {}
+    if "manifest.json" in manifest:
+        file_infos = _read_manifest_metadata(source.read("manifest.json"))
+        if missing := [
+            name for name in manifest if _DataFile.from_file_name(name) and name not in file_infos
+        ]:
+            raise ValueError(f"Manifest metadata is missing for files: {missing}")
+
+    # Incremental dump does not contain data of the tables that did not
+    # change, their files are read from earlier dumps.
+    file_sources = {data_file: source for data_files in table_files.values() for data_file in data_files}
+    if _INCREMENTAL in manifest:
+        incremental_info = json.loads(source.read(_INCREMENTAL))
+        _LOG.info("Dump is incremental, base dump is %s", incremental_info["base"])
+        for location, file_names in incremental_info["files"].items():
+            base = _DumpSource(location)
+            base_manifest = base.read("manifest.txt").decode().split()
+            if "manifest.json" in base_manifest:
+                base_infos = _read_manifest_metadata(base.read("manifest.json"))
+                file_infos.update((name, base_infos[name]) for name in file_names)
+            for table, data_files in _manifest_data_files(file_names).items():
+                table_files[table] = data_files
+                file_sources.update((data_file, base) for data_file in data_files)
 
     # Read schema.
-    schema_path = os.path.join(folder, "schema.json")
-    with open(schema_path) as f:
-        schema = json.load(f)
-        if not isinstance(schema, dict):
-            raise TypeError("Unexpected type of schema object in schema.json.")
-        if not schema:
-            raise ValueError("Empty dictionary found in schema.json.")
+    schema = json.loads(source.read("schema.json"))
+    if not isinstance(schema, dict):
+        raise TypeError("Unexpected type of schema object in schema.json.")
+    if not schema:
+        raise ValueError("Empty dictionary found in schema.json.")
+
+    # dsbulk logs and load journal are always written locally. Location has
+    # to be the same for repeated runs to be able to resume.
+    if log_dir is None:
+        if source.local_dir is not None:
+            log_dir = os.path.join(source.local_dir, _DSBULK_LOG)
+        else:
+            log_dir = os.path.join(tempfile.gettempdir(), f"dsbulk_log_{getpass.getuser()}_{keyspace}")
+            _LOG.info("dsbulk logs will be written to %s", log_dir)
+    os.makedirs(log_dir, exist_ok=True)
+
+    # The same dump can be loaded into different keyspaces.
+    journal = _LoadJournal(os.path.join(log_dir, f"_load_journal_{keyspace}.jsonl"))
+    loaded_files: dict[str, int] = {}
+    if resume:
+        loaded_files = journal.read()
+        _LOG.info("Resuming load, %d files were loaded already", len(loaded_files))
+    elif not dry_run:
+        journal.clear()
 
     options = []
     if max_concurrent_queries is not None:
@@ -444,20 +2181,38 @@ async def _load_keyspace(
 
     # Check that all explicitly requested tables exist in the dump.
     if table_patterns:
-        tables_to_load = []
-        for pattern in table_patterns:
-            if matching_tables := fnmatch.filter(schema, pattern):
-                tables_to_load += matching_tables
-            else:
-                raise ValueError(f"Pattern {pattern!r} does not match any table name.")
-        tables_to_load = sorted(set(tables_to_load))
+        tables_to_load = _match_tables(schema, table_patterns)
     else:
         tables_to_load = sorted(schema)
+    for table in tables_to_load:
+        if table not in table_files:
+            raise ValueError(f"Manifest file does not list any data files for table {table}.")
+
+    # Check that we can decompress or read all data files.
+    all_files = [data_file for table in tables_to_load for data_file in table_files[table]]
+    for codec in {data_file.codec for data_file in all_files}:
+        _check_codec(_CODECS[codec].decompress_cmd)
+    for file_format in {data_file.file_format for data_file in all_files} - {"csv"}:
+        _check_pyarrow(file_format)
+
+    # Sizes of all data files, needed for scheduling. Without metadata this
+    # may need a request per file for remote data, run them concurrently.
+    file_sizes = {
+        data_file: file_infos[data_file.file_name].size
+        for data_file in all_files
+        if data_file.file_name in file_infos
+    }
+    unknown_sizes = [data_file for data_file in all_files if data_file not in file_sizes]
+    sizes = await asyncio.gather(
+        *[asyncio.to_thread(file_sources[data_file].size, data_file.file_name) for data_file in unknown_sizes]
+    )
+    file_sizes.update(zip(unknown_sizes, sizes))
 
     exceptions = []
-    with _make_cluster(hosts, port, username, password) as cluster:
+    # Schema agreement after DDL statements is checked by _TableCreator.
+    with _make_cluster(hosts, port, username, password, max_schema_agreement_wait=0) as cluster:
         with cluster.connect() as session:
-            query = "SELECT keyspace_name FROM system_schema.keyspaces where keyspace_name ='%s'"
+            query = "SELECT keyspace_name FROM system_schema.keyspaces where keyspace_name = %s"
             result = session.execute(query, (keyspace,))
             if len(list(result)) == 0:
                 raise LookupError(
@@ -468,49 +2223,140 @@ async def _load_keyspace(
             # Find existing tables.
             existing_tables = set(_keyspace_tables(session, keyspace))
 
-            if existing_tables and not skip_existing_tables:
+            if existing_tables and not (skip_existing_tables or resume):
                 raise ValueError(
                     "Keyspace already contains some tables, "
-                    "use --skip-existing-tables option if you want to avoid restoring them."
+                    "use --skip-existing-tables option if you want to avoid restoring them, "
+                    "or --resume option to continue interrupted restore."
                 )
 
-            # Create all tables first.
+            # Schedule by file size, all shards of the same table have
+            # similar size, so they are loaded in parallel.
+            data_file_sizes: list[tuple[_DataFile, int]] = []
             for table in tables_to_load:
                 if skip_existing_tables and table in existing_tables:
+                    _LOG.info("Table %s already exists, skipping.", table)
                     continue
-                # Generate table schema and create the table.
+                for data_file in table_files[table]:
+                    if loaded_files.get(data_file.file_name) == file_sizes[data_file]:
+                        _LOG.info("File %s was already loaded, skipping.", data_file.file_name)
+                        continue
+                    data_file_sizes.append((data_file, file_sizes[data_file]))
+
+            n_tasks = max(jobs, 1)
+            data_files = _schedule_jobs(data_file_sizes, n_tasks)
+
+            progress = _Progress("restore", keyspace)
+            file_progress = {data_file: progress.add(data_file, size) for data_file, size in data_file_sizes}
+
+            # Create tables in the order in which they are loaded, on resume
+            # tables were likely created by previous run.
+            tables_to_create = [
+                table
+                for table in dict.fromkeys([data_file.table for data_file in data_files] + tables_to_load)
+                if table not in existing_tables
+            ]
+            for table in tables_to_create:
                 _LOG.info("Creating table %s", table)
-                if not dry_run:
-                    table_schema_template = Template(schema[table])
-                    table_ddl = table_schema_template.substitute(KEYSPACE=keyspace, IF_NOT_EXISTS="")
-                    session.execute(table_ddl, timeout=600.0)
+            creator: _TableCreator | None = None
+            if tables_to_create and not dry_run:
+                table_schemas = {table: schema[table] for table in tables_to_create}
+                creator = _TableCreator(session, keyspace, table_schemas)
+
+            # Files loaded by native engine, small files do not need a
+            # separate dsbulk process.
+            native_files: set[_DataFile] = set()
+            if engine == "native":
+                native_files = {data_file for data_file, _ in data_file_sizes}
+            elif small_table_size is not None:
+                native_files = {data_file for data_file, size in data_file_sizes if size < small_table_size}
+                _LOG.info("%d small files will be loaded by native engine", len(native_files))
+
+            # Native engine needs column types for parsing data, they are
+            # read again when a table is missing, e.g. was created since the
+            # last query.
+            column_types: dict[str, dict[str, str]] = {}
+            partition_keys: dict[str, list[str]] = {}
+            dsbulk_tables: set[str] = set()
+            metadata_lock = asyncio.Lock()
+
+            async def _native_writer(table: str) -> _NativeTableWriter | None:
+                # Metadata queries are blocking, they run in a separate
+                # thread, one query at a time.
+                async with metadata_lock:
+                    if table not in column_types:
+                        ready_tables = sorted(
+                            {data_file.table for data_file in native_files}
+                            & existing_tables.union(creator.ready_tables if creator else ())
+                        )
+                        column_types.update(
+                            await asyncio.to_thread(_column_types, session, keyspace, ready_tables)
+                        )
+                        partition_keys.update(
+                            await asyncio.to_thread(_partition_keys, session, keyspace, ready_tables)
+                        )
+                # Small tables with column types that native engine does not
+                # support are loaded by dsbulk.
+                if engine != "native" and not _native_types_supported(column_types[table]):
+                    if table not in dsbulk_tables:
+                        _LOG.info(
+                            "Table %s has column types not supported by native engine, using dsbulk", table
+                        )
+                        dsbulk_tables.add(table)
+                    return None
+                for cql_type in column_types[table].values():
+                    _cql_converter(cql_type)
+                return _NativeTableWriter(
+                    session,
+                    keyspace,
+                    table,
+                    column_types[table],
+                    partition_keys[table],
+                    shared_limiter or _ConcurrencyLimiter(native_concurrency, native_concurrency),
+                )
+
+            async def _load_file(data_file: _DataFile, host: str) -> None:
+                # Loading can start as soon as the table is created.
+                if creator is not None:
+                    await creator.wait(data_file.table)
+                writer: _NativeTableWriter | None = None
+                if data_file in native_files and not dry_run:
+                    writer = await _native_writer(data_file.table)
+                await _load_table(
+                    host=host,
+                    port=port,
+                    keyspace=keyspace,
+                    data_file=data_file,
+                    source=file_sources[data_file],
+                    file_size=file_sizes[data_file],
+                    file_info=file_infos.get(data_file.file_name),
+                    log_dir=log_dir,
+                    username=username,
+                    password=password,
+                    max_concurrent_queries=max_concurrent_queries,
+                    prefetch=prefetch,
+                    dry_run=dry_run,
+                    writer=writer,
+                    progress=file_progress[data_file],
+                )
 
             t0 = time.time()
 
-            n_tasks = max(jobs, 1)
-            tasks: list[asyncio.Task] = []
-            while True:
-                while tables_to_load and len(tasks) < n_tasks:
-                    table = tables_to_load.pop(0)
+            monitor_task = asyncio.create_task(progress.monitor())
 
-                    if skip_existing_tables and table in existing_tables:
-                        _LOG.info("Table %s already exists, skipping.", table)
-                        continue
+            # Each dsbulk job uses its own coordinator node, to spread the
+            # load across the cluster.
+            coordinators = itertools.cycle(hosts)
 
-                    task = asyncio.create_task(
-                        _load_table(
-                            host=hosts[0],
-                            port=port,
-                            keyspace=keyspace,
-                            table=table,
-                            folder=folder,
-                            username=username,
-                            password=password,
-                            max_concurrent_queries=max_concurrent_queries,
-                            dry_run=dry_run,
-                        )
-                    )
+            tasks: list[asyncio.Task] = []
+            task_files: dict[asyncio.Task, _DataFile] = {}
+            while True:
+                while data_files and len(tasks) < n_tasks:
+                    data_file = data_files.pop(0)
+                    file_progress[data_file].started()
+                    task = asyncio.create_task(_load_file(data_file, next(coordinators)))
                     tasks.append(task)
+                    task_files[task] = data_file
 
                 if not tasks:
                     break
@@ -519,12 +2365,35 @@ async def _load_keyspace(
                 tasks = list(pending)
 
                 for task in done:
+                    data_file = task_files.pop(task)
+                    file_progress[data_file].finished(task.exception())
+                    # Failure to create a table is reported once, even if the
+                    # table has multiple files.
                     if exc := task.exception():
-                        exceptions.append(exc)
+                        if exc not in exceptions:
+                            exceptions.append(exc)
+                    elif not dry_run:
+                        journal.add(data_file.file_name, file_sizes[data_file])
+
+            if creator is not None:
+                exceptions += [exc for exc in await creator.close() if exc not in exceptions]
+
+            monitor_task.cancel()
+            progress.log()
+            # Run report is written next to the journal, data location may be
+            # read-only.
+            if not dry_run:
+                progress.write_report(os.path.join(log_dir, f"_load_report_{keyspace}.json"))
 
             t1 = time.time()
 
             _LOG.info("Total time for restore: %.2f sec", t1 - t0)
+            if shared_limiter is not None:
+                _LOG.info(
+                    "Adaptive concurrency: final limit %d, %d overload errors",
+                    shared_limiter.limit,
+                    shared_limiter.overloads,
+                )
 
     if exceptions:
         raise BaseExceptionGroup("One or more operations failed", exceptions)
@@ -535,214 +2404,2213 @@ async def _load_table(
     host: str,
     port: int,
     keyspace: str,
-    table: str,
-    folder: str,
+    data_file: _DataFile,
+    source: _DumpSource,
+    file_size: int,
+    file_info: _FileInfo | None,
+    log_dir: str,
     username: str | None,
     password: str | None,
     max_concurrent_queries: str | None,
+    prefetch: int,
     dry_run: bool,
+    writer: _NativeTableWriter | None = None,
+    progress: _FileProgress | None = None,
 ) -> None:
-    """Dump table contents as CSV file."""
-    input_file = f"{table}.csv.gz"
-    input_path = os.path.join(folder, input_file)
+    """Load table contents, or one shard of the table, from CSV or columnar
+    file.
 
-    # dsbulk does not handle empty CSV files, skip them.
-    with gzip.open(input_path) as f:
-        data = f.read(1)
-        if not data:
-            _LOG.info("Skip restoring table %s, file %s is empty.", table, input_path)
-            return
+    If ``writer`` is given then data is inserted by that writer instead of
+    dsbulk. Columnar files are converted to CSV for dsbulk, native writer
+    inserts their values directly. Counters in ``progress`` are updated as
+    data is loaded.
+    """
+    table = data_file.table
+    input_file = data_file.file_name
 
-    _LOG.info("Restoring table %s from file %s", table, input_path)
-    if dry_run:
+    # dsbulk does not handle empty CSV files, skip them. Manifest from older
+    # dumps does not have file metadata, need to look at the file.
+    codec = _CODECS[data_file.codec]
+    if file_info is not None:
+        is_empty = file_info.raw_size == 0
+    elif data_file.file_format != "csv":
+        is_empty = False
+    else:
+        is_empty = await asyncio.to_thread(_is_empty_file, source, input_file, file_size, codec)
+    if is_empty:
+        _LOG.info("Skip restoring table %s, file %s is empty.", table, input_file)
         return
 
-    log_dir = os.path.join(folder, _DSBULK_LOG)
-    os.makedirs(log_dir, exist_ok=True)
-
-    # Command to load table data in CSV format from stdin.
-    cmd = [
-        "dsbulk",
-        "load",
-        "-h",
-        f'["{host}"]',
-        "-port",
-        str(port),
-        "-k",
-        keyspace,
-        "-t",
-        table,
-        "-logDir",
-        log_dir,
-        "--log.verbosity",
-        "quiet",
-    ]
-    if username:
-        cmd += ["-u", username]
-    if password:
-        cmd += ["-p", password, "--driver.advanced.auth-provider.class=PlainTextAuthProvider"]
-    if max_concurrent_queries:
-        cmd += ["--engine.maxConcurrentQueries", max_concurrent_queries]
-
-    # Run gunzip and pipe its output to dsbulk.
-    fd = None
-    try:
-        fd = os.open(input_path, os.O_RDONLY | os.O_DIRECT)
-    except Exception as exc:
-        raise RuntimeError(f"Failed to open input file: {exc}") from None
-
-    try:
-        shell_cmd = "gunzip |" + shlex.join(cmd)
-        dsbulk = await asyncio.create_subprocess_shell(shell_cmd, stdin=fd)
-        returncode = await dsbulk.wait()
-        if returncode != 0:
-            raise RuntimeError(f"Failed to execute dsbulk for table {table}: return code = {returncode}")
-    except Exception as exc:
-        raise RuntimeError(f"Failed to execute dsbulk load for table {table}: {exc}") from None
-    finally:
-        os.close(fd)
+    _LOG.info("Restoring table %s from file %s", table, input_file)
+    if dry_run:
+        return
 
-    _LOG.info("Finished restoring table %s", table)
+    cmd = _dsbulk_load_command(
+        host, port, keyspace, table, log_dir, username, password, max_concurrent_queries
+    )
 
+    # Run decompression and pipe its output to dsbulk or native writer,
+    # both streams pass through this process to verify them against
+    # manifest.
+    if progress is None:
+        progress = _FileProgress(data_file.file_name, table, file_size)
+    raw = progress.raw
+    stored = progress.stored
+    commands = [] if writer is not None else [cmd]
+    engine = "native" if writer is not None else "dsbulk"
+    observers: list[Callable[[bytes], None] | None] = []
+    if codec.decompress_cmd:
+        commands.insert(0, list(codec.decompress_cmd))
+        observers += [stored.update, raw.update]
+    else:
 
-def _walk_files(path: ResourcePath) -> Iterator[ResourcePath]:
-    """Find all files in a specified directory."""
-    for rp, _, files in path.walk():
-        for file_name in files:
-            yield rp.join(file_name)
+        def _update(data: bytes) -> None:
+            raw.update(data)
+            stored.update(data)
 
+        observers.append(_update)
 
-def _make_tarball(dump_location: ResourcePath, manifest: list[str], local_bundle_path: ResourcePath) -> None:
-    """Make a tarball with all files in manifest plus manifest itself and
-    dsbulk log files.
-    """
-    # We are not compressing tar, bulk of data is already compressed.
-    _LOG.info("Creating tarball %s", local_bundle_path)
-    members = manifest + ["manifest.txt", _DSBULK_LOG]
     try:
-        with tarfile.open(local_bundle_path.ospath, "w") as tar:
-            for member in members:
-                member_path = dump_location.join(member)
-                tar.add(member_path.ospath, member)
-                # Delete file after adding it to a tarball, could avoid running
-                # out of disk space on large backups. We do not care to remove
-                # dsbulk logs as they are small and will be removed when tmp
-                # directory is removed.
-                if member != _DSBULK_LOG:
-                    member_path.remove()
-    except Exception:
-        # Delete partial tarball on any errors.
-        try:
-            local_bundle_path.remove()
-        except Exception:
-            pass
-        raise
+        input_path, offset, size = await asyncio.to_thread(source.byte_range, input_file)
+        if data_file.file_format != "csv":
+            async with aclosing(
+                _columnar_batches(data_file.file_format, input_path, offset, size)
+            ) as batches:
+                if writer is not None:
+                    async for batch in batches:
+                        await writer.write_batch(batch)
+                        progress.batch_rows += batch.num_rows
+                    await writer.close()
+                else:
+                    async with aclosing(_columnar_csv_chunks(batches)) as chunks:
+                        await _run_pipeline([cmd], source=chunks, observers=[raw.update])
+        else:
+            async with aclosing(_read_byte_range(input_path, offset, size, prefetch)) as chunks:
+                if writer is not None:
+                    await _run_pipeline(commands, source=chunks, sink=writer.feed, observers=observers)
+                    await writer.close()
+                else:
+                    await _run_pipeline(commands, source=chunks, observers=observers)
+    except Exception as exc:
+        raise RuntimeError(f"Failed to execute {engine} load for table {table}: {exc}") from None
 
+    # Data is already loaded at this point, but file will not be recorded as
+    # loaded in the journal.
+    if file_info is not None and data_file.file_format != "csv":
+        file_info.verify_rows(size, writer.rows if writer is not None else raw.rows)
+    elif file_info is not None:
+        file_info.verify(stored, raw)
 
-def _make_zip(dump_location: ResourcePath, manifest: list[str], local_bundle_path: ResourcePath) -> None:
-    """Make a zip archive with all files in manifest plus manifest itself and
-    dsbulk log files.
-    """
-    _LOG.info("Creating zip archive %s", local_bundle_path)
-    members = manifest + ["manifest.txt"]
-    try:
-        # We are not compressing zip, bulk of data is already compressed.
-        with zipfile.ZipFile(local_bundle_path.ospath, "w", compression=zipfile.ZIP_STORED) as archive:
-            for member in members:
-                member_path = dump_location.join(member)
-                archive.write(member_path.ospath, member)
-                # Delete file after adding it to archive.
-                member_path.remove()
-
-            # And all dsbulk log files.
-            for local_path in _walk_files(dump_location.join(_DSBULK_LOG)):
-                archive.write(local_path.ospath, local_path.relative_to(dump_location))
-
-    except Exception:
-        # Delete partial archive on any errors.
-        try:
-            local_bundle_path.remove()
-        except Exception:
-            pass
-        raise
+    _LOG.info("Finished restoring table %s from file %s", table, input_file)
 
 
-def _table_schema(
+async def _copy_keyspace(
+    *,
     keyspace: str,
     hosts: list[str],
     port: int,
     username: str | None,
     password: str | None,
+    dest_hosts: list[str],
+    dest_keyspace: str,
+    dest_port: int,
+    dest_username: str | None,
+    dest_password: str | None,
     table_patterns: list[str],
-) -> dict[str, str]:
-    """Extract schema definition for all tables to be dumped.
+    skip_existing_tables: bool,
+    jobs: int,
+    shards: int,
+    shard_patterns: list[str],
+    max_concurrent_queries: str | None,
+    log_dir: str | None,
+) -> None:
+    # Need dsbulk, check that it can be found.
+    _check_dsbulk()
+
+    if shards < 1:
+        raise ValueError(f"Number of shards must be positive: {shards}.")
+    if not dest_hosts:
+        raise ValueError("Destination hosts must be specified.")
 
-    Returns a dict with a table name as a key and "CREATE TABLE" template as a
-    value.
-    """
     with _make_cluster(hosts, port, username, password) as cluster:
         with cluster.connect() as session:
-            # Check that keyspace exists.
-            query = "SELECT keyspace_name FROM system_schema.keyspaces WHERE keyspace_name = '%s'"
-            result = session.execute(query, [keyspace])
-            if not result:
-                raise ValueError(f"Keyspace {keyspace!r} does not exist.")
-
-            # Get the list of tables.
-            tables = sorted(_keyspace_tables(session, keyspace))
-            if not tables:
-                raise ValueError(f"Keyspace {keyspace!r} does not have any tables.")
-            if table_patterns:
-                tables_to_dump: set[str] = set()
-                for pattern in table_patterns:
-                    if matching_tables := fnmatch.filter(tables, pattern):
-                        tables_to_dump.update(matching_tables)
-                    else:
-                        raise ValueError(f"Pattern {pattern!r} does not match any table name.")
-                tables = sorted(tables_to_dump)
-
-            # Dump schema for all tables but do not include CREATE KEYSPACE.
-            schema = {}
-            for table in tables:
-                query = f'DESCRIBE "{keyspace}"."{table}"'
-                result = session.execute(query)
-                table_schema = result.one().create_statement
-                table_schema = _replace_ks_name(table_schema)
-                schema[table] = table_schema
-
-            return schema
+            # Get schema for all tables to be copied.
+            schema = await _table_schema(session, keyspace, table_patterns)
 
+            # Find partition keys for the tables that need sharding.
+            partition_keys: dict[str, list[str]] = {}
+            if shards > 1:
+                if not (cluster.metadata.partitioner or "").endswith("Murmur3Partitioner"):
+                    raise ValueError(
+                        "Sharding is only supported for Murmur3Partitioner, "
+                        f"cluster uses {cluster.metadata.partitioner!r}."
+                    )
+                sharded_tables = _match_tables(schema, shard_patterns) if shard_patterns else sorted(schema)
+                partition_keys = _partition_keys(session, keyspace, sharded_tables)
 
-def _check_dsbulk() -> None:
-    """Check that dsbulk application can be executed."""
-    try:
-        subprocess.run(("dsbulk", "--version"), capture_output=True)
-    except Exception as exc:
-        raise RuntimeError(f"Failed to execute dsbulk, check $PATH: {exc}") from None
+            # Estimated table sizes are used for scheduling.
+            table_sizes = _table_size_estimates(session, keyspace)
 
+    if log_dir is None:
+        log_dir = os.path.join(tempfile.gettempdir(), f"dsbulk_log_{getpass.getuser()}_{dest_keyspace}")
+        _LOG.info("dsbulk logs will be written to %s", log_dir)
+    os.makedirs(log_dir, exist_ok=True)
 
-def _make_auth_provider(username: str | None, password: str | None) -> AuthProvider | None:
+    exceptions = []
+    # Schema agreement after DDL statements is checked by _TableCreator.
+    with _make_cluster(
+        dest_hosts, dest_port, dest_username, dest_password, max_schema_agreement_wait=0
+    ) as cluster:
+        with cluster.connect() as session:
+            query = "SELECT keyspace_name FROM system_schema.keyspaces where keyspace_name = %s"
+            result = session.execute(query, (dest_keyspace,))
+            if len(list(result)) == 0:
+                raise LookupError(
+                    f"Keyspace {dest_keyspace!r} does not exist in destination cluster, "
+                    "it has to be created first."
+                )
+
+            # Find existing tables.
+            existing_tables = set(_keyspace_tables(session, dest_keyspace))
+
+            if existing_tables and not skip_existing_tables:
+                raise ValueError(
+                    "Destination keyspace already contains some tables, "
+                    "use --skip-existing-tables option if you want to avoid copying them."
+                )
+
+            # Sharded tables are copied by multiple jobs, shards are
+            # scheduled by their estimated size. Data files are not written,
+            # their names only identify shards in the logs and run report.
+            data_file_sizes: list[tuple[_DataFile, int]] = []
+            for table in sorted(schema):
+                if table in existing_tables:
+                    _LOG.info("Table %s already exists, skipping.", table)
+                    continue
+                table_size = table_sizes.get(table, 0)
+                if table in partition_keys:
+                    for shard, token_range in enumerate(_split_token_range(shards)):
+                        data_file_sizes.append(
+                            (_DataFile(table, shard, token_range, codec="none"), table_size // shards)
+                        )
+                else:
+                    data_file_sizes.append((_DataFile(table, codec="none"), table_size))
+
+            n_tasks = max(jobs, 1)
+            data_files = _schedule_jobs(data_file_sizes, n_tasks)
+
+            progress = _Progress("copy", keyspace)
+            file_progress = {data_file: progress.add(data_file, size) for data_file, size in data_file_sizes}
+
+            # Create tables in the order in which they are copied.
+            tables_to_create = list(dict.fromkeys(data_file.table for data_file in data_files))
+            for table in tables_to_create:
+                _LOG.info("Creating table %s", table)
+            creator = _TableCreator(
+                session, dest_keyspace, {table: schema[table] for table in tables_to_create}
+            )
+
+            async def _copy_file(data_file: _DataFile, source_host: str, dest_host: str) -> None:
+                # Copying can start as soon as the table is created.
+                await creator.wait(data_file.table)
+                await _copy_table(
+                    source_host=source_host,
+                    source_port=port,
+                    keyspace=keyspace,
+                    dest_host=dest_host,
+                    dest_port=dest_port,
+                    dest_keyspace=dest_keyspace,
+                    data_file=data_file,
+                    partition_key=partition_keys.get(data_file.table, []),
+                    log_dir=log_dir,
+                    username=username,
+                    password=password,
+                    dest_username=dest_username,
+                    dest_password=dest_password,
+                    max_concurrent_queries=max_concurrent_queries,
+                    progress=file_progress[data_file],
+                )
+
+            t0 = time.time()
+
+            monitor_task = asyncio.create_task(progress.monitor())
+
+            # Each job uses its own coordinator node in both clusters.
+            source_coordinators = itertools.cycle(hosts)
+            dest_coordinators = itertools.cycle(dest_hosts)
+
+            tasks: list[asyncio.Task] = []
+            task_files: dict[asyncio.Task, _DataFile] = {}
+            while True:
+                while data_files and len(tasks) < n_tasks:
+                    data_file = data_files.pop(0)
+                    file_progress[data_file].started()
+                    task = asyncio.create_task(
+                        _copy_file(data_file, next(source_coordinators), next(dest_coordinators))
+                    )
+                    tasks.append(task)
+                    task_files[task] = data_file
+
+                if not tasks:
+                    break
+
+                done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                tasks = list(pending)
+
+                for task in done:
+                    file_progress[task_files.pop(task)].finished(task.exception())
+                    # Failure to create a table is reported once, even if the
+                    # table has multiple shards.
+                    if (exc := task.exception()) and exc not in exceptions:
+                        exceptions.append(exc)
+
+            exceptions += [exc for exc in await creator.close() if exc not in exceptions]
+
+            monitor_task.cancel()
+            progress.log()
+            progress.write_report(os.path.join(log_dir, f"_copy_report_{dest_keyspace}.json"))
+
+            t1 = time.time()
+
+            _LOG.info("Total time for copy: %.2f sec", t1 - t0)
+
+    if exceptions:
+        raise BaseExceptionGroup("One or more operations failed", exceptions)
+
+
+async def _copy_table(
+    *,
+    source_host: str,
+    source_port: int,
+    keyspace: str,
+    dest_host: str,
+    dest_port: int,
+    dest_keyspace: str,
+    data_file: _DataFile,
+    partition_key: list[str],
+    log_dir: str,
+    username: str | None,
+    password: str | None,
+    dest_username: str | None,
+    dest_password: str | None,
+    max_concurrent_queries: str | None,
+    progress: _FileProgress,
+) -> None:
+    """Copy table contents, or one token-range shard of the table, from one
+    cluster to another.
+
+    Output of dsbulk unload is passed to dsbulk load through a bounded queue,
+    so unload is paused when load cannot keep up. Load is only started when
+    unload produces some data, dsbulk does not handle empty input.
+    """
+    table = data_file.table
+    unload_cmd = _dsbulk_unload_command(
+        source_host, source_port, keyspace, data_file, partition_key, log_dir, username, password
+    )
+    load_cmd = _dsbulk_load_command(
+        dest_host,
+        dest_port,
+        dest_keyspace,
+        table,
+        log_dir,
+        dest_username,
+        dest_password,
+        max_concurrent_queries,
+    )
+
+    # Data is not stored, both counters measure the data passed between
+    # clusters.
+    def _update(data: bytes) -> None:
+        progress.raw.update(data)
+        progress.stored.update(data)
+
+    # None marks the end of data.
+    queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=_COPY_QUEUE_SIZE)
+
+    async def _unload() -> None:
+        await _run_pipeline([unload_cmd], sink=queue.put, observers=[None, _update])
+        await queue.put(None)
+
+    async def _chunks(first: bytes) -> AsyncGenerator[bytes]:
+        chunk: bytes | None = first
+        while chunk is not None:
+            yield chunk
+            chunk = await queue.get()
+
+    what = table if data_file.shard is None else f"{table} shard {data_file.shard}"
+    _LOG.info("Copying table %s", what)
+    try:
+        async with asyncio.TaskGroup() as group:
+            group.create_task(_unload())
+            if (first := await queue.get()) is not None:
+                group.create_task(_run_pipeline([load_cmd], source=_chunks(first)))
+    except Exception as exc:
+        # Unwrap single exception from TaskGroup for a readable message.
+        if isinstance(exc, ExceptionGroup) and len(exc.exceptions) == 1:
+            exc = exc.exceptions[0]
+        raise RuntimeError(f"Failed to copy table {what}: {exc}") from exc
+
+    if progress.raw.size == 0:
+        _LOG.info("Table %s is empty, nothing to copy.", what)
+    else:
+        _LOG.info("Finished copying table %s, %d rows", what, progress.rows)
+
+
+class _TableCreator:
+    """Creator of tables which runs DDL statements concurrently.
+
+    Parameters
+    ----------
+    session : `cassandra.cluster.Session`
+        Session for executing DDL, its cluster has to be created with
+        ``max_schema_agreement_wait=0``.
+    keyspace : `str`
+        Keyspace name.
+    table_schemas : `dict` [`str`, `str`]
+        Templates of CREATE TABLE statements, indexed by table name, in the
+        order in which tables are needed.
+
+    Notes
+    -----
+    Driver normally waits for schema agreement after each DDL statement,
+    and these waits are serialized, which makes creating many tables very
+    slow. Here statements are executed with limited concurrency without
+    that wait, instead schema agreement is checked once for all statements
+    that completed since the previous check. Tables become ready after such
+    a check succeeds, the last check happens after all statements complete.
+    Statements that fail with timeouts or server errors are retried with
+    ``IF NOT EXISTS``, as the table could be created by the failed attempt.
+    """
+
+    def __init__(self, session: Session, keyspace: str, table_schemas: dict[str, str]):
+        self._session = session
+        self._keyspace = keyspace
+        self._semaphore = asyncio.Semaphore(_DDL_CONCURRENCY)
+        self._created: list[str] = []
+        self._wakeup = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._ready = {table: loop.create_future() for table in table_schemas}
+        self._ddl_tasks = [
+            asyncio.create_task(self._create(table, schema)) for table, schema in table_schemas.items()
+        ]
+        self._task = asyncio.create_task(self._confirm())
+
+    @property
+    def ready_tables(self) -> list[str]:
+        """Tables that were created and agreed upon (`list` [`str`])."""
+        return [
+            table for table, future in self._ready.items() if future.done() and future.exception() is None
+        ]
+
+    async def wait(self, table: str) -> None:
+        """Wait until table is created and schema agreement is reached,
+        tables that are not managed by this creator are ready immediately.
+        """
+        if (future := self._ready.get(table)) is not None:
+            await asyncio.shield(future)
+
+    async def close(self) -> list[BaseException]:
+        """Wait until all tables are processed.
+
+        Returns
+        -------
+        exceptions : `list` [`BaseException`]
+            Exceptions for tables which could not be created.
+        """
+        await self._task
+        return [exc for future in self._ready.values() if (exc := future.exception()) is not None]
+
+    async def _create(self, table: str, schema: str) -> None:
+        """Execute DDL for one table."""
+        template = Template(schema)
+        try:
+            async with self._semaphore:
+                for attempt in range(_DDL_RETRIES + 1):
+                    # Previous attempt could have succeeded.
+                    if_not_exists = "IF NOT EXISTS" if attempt > 0 else ""
+                    table_ddl = template.substitute(KEYSPACE=self._keyspace, IF_NOT_EXISTS=if_not_exists)
+                    try:
+                        await _execute_async(self._session, table_ddl, timeout=_DDL_TIMEOUT)
+                        break
+                    except _DDL_RETRY_ERRORS as exc:
+                        if attempt == _DDL_RETRIES:
+                            raise
+                        _LOG.warning("Retrying creation of table %s after error: %s", table, exc)
+            self._created.append(table)
+        except Exception as exc:
+            self._ready[table].set_exception(exc)
+        finally:
+            self._wakeup.set()
+
+    async def _confirm(self) -> None:
+        """Check schema agreement for created tables until all DDL
+        statements complete.
+        """
+        control_connection = self._session.cluster.control_connection
+        n_failures = 0
+        while True:
+            ddl_done = all(task.done() for task in self._ddl_tasks)
+            if not self._created:
+                if ddl_done:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            tables, self._created = self._created, []
+            agreed = await asyncio.to_thread(
+                control_connection.wait_for_schema_agreement, wait_time=_SCHEMA_AGREEMENT_WAIT
+            )
+            if agreed:
+                n_failures = 0
+                for table in tables:
+                    self._ready[table].set_result(None)
+                _LOG.debug("Schema agreement reached for %d tables", len(tables))
+                continue
+            # Schema may be changing while other statements are running, only
+            # count failures when nothing else is running.
+            _LOG.warning("Schema agreement was not reached for %d tables, retrying", len(tables))
+            if ddl_done:
+                n_failures += 1
+                if n_failures > _DDL_RETRIES:
+                    for table in tables:
+                        self._ready[table].set_exception(
+                            RuntimeError(f"Schema agreement was not reached after creating table {table}.")
+                        )
+                    continue
+            self._created = tables + self._created
+
+
+class _CsvBlockParser:
+    """Incremental parser of a CSV data stream produced by dsbulk.
+
+    Notes
+    -----
+    Data is parsed in large blocks of complete records, each block is parsed
+    by the `csv` module in one call. Block ends at the last newline which is
+    outside quoted values, found from the parity of the number of quotes
+    (see `_CsvCounter`), only the incomplete record at the end is kept for
+    the next piece. Parity is updated with each piece, so every piece is
+    scanned once. Empty quoted values are returned as ``_CSV_EMPTY``, see
+    `_parse_csv`.
+
+    Parameters
+    ----------
+    max_record_size : `int`, optional
+        Maximum size of an incomplete record in characters.
+    """
+
+    def __init__(self, max_record_size: int = _CSV_MAX_RECORD_SIZE) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._max_record_size = max_record_size
+        # Default limit of the csv module (128 KiB) is too small for large
+        # text and blob values.
+        if csv.field_size_limit() < max_record_size:
+            csv.field_size_limit(max_record_size)
+        # Pieces of the incomplete record and their total size.
+        self._pieces: list[str] = []
+        self._size = 0
+        # True if incomplete record has an open quote.
+        self._open_quote = False
+        # True if incomplete record ends with an unpaired backslash.
+        self._escape = False
+
+    def feed(self, data: bytes) -> list[list[str]]:
+        """Parse next piece of the stream, return all complete rows.
+
+        Raises
+        ------
+        csv.Error
+            Raised if complete records cannot be parsed, or if incomplete
+            record is too long.
+        """
+        text = self._decoder.decode(data)
+        if not text:
+            return []
+        # First character is escaped by a backslash at the end of the
+        # previous piece.
+        rest = text[1:] if self._escape and text[0] in ('"', "\\") else text
+        self._escape = (len(rest) - len(rest.rstrip("\\"))) % 2 == 1
+        self._open_quote ^= _quote_count(rest) % 2 == 1
+
+        end = text.rfind("\n") + 1
+        # If the last newline is inside a quoted value, move back over the
+        # newlines of that value. Escape sequences cannot span newlines, so
+        # quotes can be counted between newlines. Incomplete record has no
+        # newlines outside quotes, so search stops at the start of the piece.
+        open_quote = self._open_quote ^ (_quote_count(text[end:]) % 2 == 1)
+        while end and open_quote:
+            start = text.rfind("\n", 0, end - 1) + 1
+            open_quote = _quote_count(text[start:end]) % 2 == 0
+            end = start
+
+        rows: list[list[str]] = []
+        if end:
+            self._pieces.append(text[:end])
+            rows = _parse_csv("".join(self._pieces))
+            self._pieces = []
+            self._size = 0
+            text = text[end:]
+        self._pieces.append(text)
+        self._size += len(text)
+        if self._size > self._max_record_size:
+            raise csv.Error(f"Incomplete CSV record is longer than {self._max_record_size} characters.")
+        return rows
+
+    def close(self) -> list[list[str]]:
+        """Parse remaining data at the end of the stream."""
+        self._pieces.append(self._decoder.decode(b"", final=True))
+        text = "".join(self._pieces)
+        self._pieces = []
+        self._size = 0
+        return _parse_csv(text)
+
+
+class _NativeTableWriter:
+    """Parser of a CSV data stream produced by dsbulk or of Arrow record
+    batches, which inserts parsed rows into a table.
+
+    Parameters
+    ----------
+    session : `cassandra.cluster.Session`
+        Session for executing inserts.
+    keyspace : `str`
+        Keyspace name.
+    table : `str`
+        Table name.
+    column_types : `dict` [`str`, `str`]
+        CQL types of the table columns, indexed by column name.
+    partition_key : `list` [`str`]
+        Names of the partition key columns.
+    limiter : `_ConcurrencyLimiter`
+        Limiter for the number of concurrent requests, can be shared with
+        other writers.
+
+    Notes
+    -----
+    Data is parsed in large blocks of complete lines, see `_CsvBlockParser`.
+    Parsing and conversion of values run in a separate thread, so that other
+    pipelines are not stalled while a block is converted. Rows in a block are
+    grouped by their partition key, rows of the same partition are inserted
+    in unlogged batches. Requests that fail with
+    overload errors are retried if the limiter allows it.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        keyspace: str,
+        table: str,
+        column_types: dict[str, str],
+        partition_key: list[str],
+        limiter: _ConcurrencyLimiter,
+    ):
+        self._session = session
+        self._keyspace = keyspace
+        self._table = table
+        self._column_types = column_types
+        self._partition_key = partition_key
+        self._parser = _CsvBlockParser()
+        self._statement: PreparedStatement | None = None
+        self._converters: list[Callable[[str], Any]] = []
+        self._key_index: list[int] = []
+        self._limiter = limiter
+        self._pending: set[asyncio.Future] = set()
+        self._errors: list[BaseException] = []
+        self.rows = 0
+
+    async def feed(self, data: bytes) -> None:
+        """Parse next piece of the stream and insert all complete rows."""
+        self._check_errors()
+        await self._insert(await asyncio.to_thread(self._parser.feed, data))
+
+    async def write_batch(self, batch: Any) -> None:
+        """Insert all rows of an Arrow record batch.
+
+        Columns that are stored as strings are converted according to the
+        CQL types of the table, other columns have values of their types.
+        """
+        self._check_errors()
+        if self._statement is None:
+            await self._prepare(batch.schema.names)
+        if batch.num_rows:
+            rows = await asyncio.to_thread(self._batch_rows, batch)
+            await self._send(rows)
+
+    async def close(self) -> None:
+        """Insert remaining data and wait for all requests to finish."""
+        await self._insert(await asyncio.to_thread(self._parser.close))
+        # Retries can add more requests while waiting.
+        while self._pending:
+            await asyncio.wait(self._pending)
+        self._check_errors()
+
+    async def _insert(self, rows: list[list[str]]) -> None:
+        """Convert parsed CSV rows and send them to the cluster."""
+        if rows and self._statement is None:
+            await self._prepare(rows.pop(0))
+        if not rows:
+            return
+        await self._send(await asyncio.to_thread(self._csv_rows, rows))
+
+    def _csv_rows(self, rows: list[list[str]]) -> list[tuple]:
+        """Convert parsed CSV rows to column values."""
+        return [
+            tuple(
+                [
+                    None if value == "" else ("" if value == _CSV_EMPTY else convert(value))
+                    for convert, value in zip(self._converters, row)
+                ]
+            )
+            for row in rows
+        ]
+
+    def _batch_rows(self, batch: Any) -> list[tuple]:
+        """Convert Arrow record batch to a list of rows."""
+        columns = []
+        for field, column, convert in zip(batch.schema, batch.columns, self._converters):
+            values = column.to_pylist()
+            if pyarrow.types.is_string(field.type):
+                values = [None if value is None else convert(value) for value in values]
+            columns.append(values)
+        return list(zip(*columns))
+
+    async def _send(self, rows: list[tuple]) -> None:
+        """Group rows by partition and send them to the cluster."""
+        assert self._statement is not None
+        partitions: dict[tuple, list[tuple]] = {}
+        for values in rows:
+            key = tuple([values[idx] for idx in self._key_index])
+            partitions.setdefault(key, []).append(values)
+        self.rows += len(rows)
+
+        for partition_rows in partitions.values():
+            for start in range(0, len(partition_rows), _NATIVE_BATCH_ROWS):
+                batch_rows = partition_rows[start : start + _NATIVE_BATCH_ROWS]
+                statement: BoundStatement | BatchStatement
+                if len(batch_rows) == 1:
+                    statement = self._statement.bind(batch_rows[0])
+                else:
+                    statement = BatchStatement(batch_type=BatchType.UNLOGGED)
+                    for values in batch_rows:
+                        statement.add(self._statement, values)
+                await self._submit(statement, 0)
+
+    async def _submit(self, statement: Statement, attempt: int) -> None:
+        """Send one request when the limiter allows it."""
+        start = await self._limiter.acquire()
+        if self._errors:
+            self._limiter.cancel()
+            self._check_errors()
+        future = _execute_async(self._session, statement)
+        self._pending.add(future)
+        future.add_done_callback(lambda future: self._request_done(future, statement, start, attempt))
+
+    async def _prepare(self, header: list[str]) -> None:
+        """Prepare insert statement for the columns in the header."""
+        try:
+            self._converters = [_cql_converter(self._column_types[column]) for column in header]
+            self._key_index = [header.index(column) for column in self._partition_key]
+        except (KeyError, ValueError) as exc:
+            raise ValueError(f"Data file header does not match table {self._table}: {exc}") from None
+        columns = ", ".join(f'"{column}"' for column in header)
+        values = ", ".join("?" * len(header))
+        query = f'INSERT INTO "{self._keyspace}"."{self._table}" ({columns}) VALUES ({values})'
+        self._statement = await asyncio.to_thread(self._session.prepare, query)
+
+    def _request_done(self, future: asyncio.Future, statement: Statement, start: float, attempt: int) -> None:
+        self._pending.discard(future)
+        exc = None if future.cancelled() else future.exception()
+        overloaded = isinstance(exc, _OVERLOAD_ERRORS)
+        self._limiter.release(start, overloaded)
+        if exc is None:
+            return
+        if overloaded and attempt < self._limiter.retries and not self._errors:
+            _LOG.debug("Retrying request for table %s after error: %s", self._table, exc)
+            retry = asyncio.ensure_future(self._submit(statement, attempt + 1))
+            self._pending.add(retry)
+            retry.add_done_callback(self._retry_done)
+        else:
+            self._errors.append(exc)
+
+    def _retry_done(self, task: asyncio.Future) -> None:
+        self._pending.discard(task)
+        if not task.cancelled() and (exc := task.exception()) is not None:
+            self._errors.append(exc)
+
+    def _check_errors(self) -> None:
+        if self._errors:
+            raise self._errors[0]
+
+
+class _ConcurrencyLimiter:
+    """Limiter for the number of concurrent requests, which adapts the limit
+    to the observed latency and overload errors (AIMD).
+
+    Parameters
+    ----------
+    min_limit : `int`
+        Lower bound for the limit.
+    max_limit : `int`
+        Upper bound for the limit, if it is equal to ``min_limit`` the limit
+        is fixed and failed requests are not retried.
+
+    Notes
+    -----
+    Limit starts at the lower bound and is increased by one after each
+    ``limit`` successful requests. An overload error decreases the limit by
+    ``_ADAPTIVE_TIMEOUT_DECREASE`` factor, latency that is much higher than
+    the baseline decreases it by ``_ADAPTIVE_LATENCY_DECREASE``. Baseline is
+    the minimal observed latency, which slowly drifts up to follow changes
+    in the cluster. Only requests started after the previous decrease can
+    decrease the limit again, many requests failing at the same time count
+    as a single signal.
+    """
+
+    def __init__(self, min_limit: int, max_limit: int):
+        self._min_limit = max(min_limit, 1)
+        self._max_limit = max(max_limit, self._min_limit)
+        self._limit = float(self._min_limit)
+        self._in_flight = 0
+        self._waiters: list[asyncio.Future] = []
+        self._baseline = math.inf
+        self._last_decrease = 0.0
+        self.retries = _ADAPTIVE_RETRIES if self._max_limit > self._min_limit else 0
+        self.overloads = 0
+
+    @property
+    def limit(self) -> int:
+        """Current limit (`int`)."""
+        return int(self._limit)
+
+    async def acquire(self) -> float:
+        """Wait until a request can be sent, return its start time."""
+        while self._in_flight >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            await waiter
+        self._in_flight += 1
+        return time.monotonic()
+
+    def release(self, start: float, overloaded: bool) -> None:
+        """Account for a finished request.
+
+        Parameters
+        ----------
+        start : `float`
+            Start time of the request returned from `acquire`.
+        overloaded : `bool`
+            `True` if request failed with an overload error.
+        """
+        self._in_flight -= 1
+        if self._max_limit > self._min_limit:
+            now = time.monotonic()
+            latency = now - start
+            self._baseline = min(latency, self._baseline * 1.001)
+            decrease = 1.0
+            if overloaded:
+                self.overloads += 1
+                decrease = _ADAPTIVE_TIMEOUT_DECREASE
+            elif latency > self._baseline * _ADAPTIVE_LATENCY_FACTOR:
+                decrease = _ADAPTIVE_LATENCY_DECREASE
+            if decrease < 1.0:
+                if start >= self._last_decrease:
+                    self._limit = max(self._limit * decrease, self._min_limit)
+                    self._last_decrease = now
+                    _LOG.debug("Concurrency limit decreased to %d", self.limit)
+            else:
+                self._limit = min(self._limit + 1.0 / self._limit, self._max_limit)
+        self._wake()
+
+    def cancel(self) -> None:
+        """Return a slot acquired for a request that was not sent."""
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        # Waiters check the limit again.
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
+
+
+def _adaptive_bounds(adaptive_concurrency: str) -> tuple[int, int]:
+    """Parse bounds for adaptive concurrency in MIN:MAX format."""
+    try:
+        min_limit, max_limit = (int(value) for value in adaptive_concurrency.split(":"))
+    except ValueError:
+        raise ValueError(f"Unexpected format of adaptive concurrency: {adaptive_concurrency!r}.") from None
+    if not 0 < min_limit <= max_limit:
+        raise ValueError(f"Unexpected adaptive concurrency bounds: {adaptive_concurrency!r}.")
+    return min_limit, max_limit
+
+
+def _native_concurrency(max_concurrent_queries: str | None) -> int:
+    """Convert dsbulk-style concurrency option (AUTO, <N>, or <N>C for a
+    multiple of CPU count) to the number of concurrent requests.
+    """
+    if max_concurrent_queries is None or max_concurrent_queries.upper() == "AUTO":
+        return _NATIVE_CONCURRENCY
+    if max_concurrent_queries.upper().endswith("C"):
+        return max(int(float(max_concurrent_queries[:-1]) * (os.cpu_count() or 1)), 1)
+    return int(max_concurrent_queries)
+
+
+def _execute_async(
+    session: Session, statement: Statement | str, timeout: float = _NATIVE_TIMEOUT
+) -> asyncio.Future:
+    """Execute statement asynchronously, returning asyncio future."""
+    loop = asyncio.get_running_loop()
+    result: asyncio.Future = loop.create_future()
+
+    def _set_result(rows: Any) -> None:
+        if not result.done():
+            result.set_result(rows)
+
+    def _set_exception(exc: BaseException) -> None:
+        if not result.done():
+            result.set_exception(exc)
+
+    future = session.execute_async(statement, timeout=timeout)
+    # Callbacks are called from driver threads.
+    future.add_callbacks(
+        callback=lambda rows: loop.call_soon_threadsafe(_set_result, rows),
+        errback=lambda exc: loop.call_soon_threadsafe(_set_exception, exc),
+    )
+    return result
+
+
+def _quote_count(text: str) -> int:
+    """Return number of quotes in CSV text that are not escaped."""
+    return _CSV_ESCAPE_RE.sub("", text).count('"')
+
+
+def _parse_csv(text: str) -> list[list[str]]:
+    """Parse complete lines of CSV data written by dsbulk.
+
+    Empty quoted values are returned as ``_CSV_EMPTY`` to distinguish them
+    from empty unquoted values, which are nulls.
+
+    Raises
+    ------
+    csv.Error
+        Raised if the last value is incomplete.
+    """
+    if not text:
+        return []
+    # Backslash escapes (`_CSV_ESCAPE_RE`) are replaced with doubled quotes
+    # and single backslashes, csv escapechar would also drop literal
+    # backslashes from older dumps.
+    text = _CSV_EMPTY_FIELD_RE.sub(f'"{_CSV_EMPTY}"', text)
+    text = _CSV_ESCAPE_RE.sub(lambda match: '""' if match[1] == '"' else "\\", text)
+    return list(csv.reader(io.StringIO(text), strict=True))
+
+
+def _cql_converter(cql_type: str) -> Callable[[str], Any]:
+    """Return function which converts CSV value to a column value for
+    insert.
+
+    Raises
+    ------
+    ValueError
+        Raised if type is not supported.
+    """
+    cql_type = cql_type.strip()
+    if cql_type.startswith("frozen<"):
+        return _cql_converter(cql_type.removeprefix("frozen<").removesuffix(">"))
+    if (converter := _CQL_CONVERTERS.get(cql_type)) is not None:
+        return converter
+    kind, _, args = cql_type.partition("<")
+    if kind in ("list", "set", "map"):
+        # Collections are written as JSON, elements that are JSON strings may
+        # need conversion.
+        arg_converters = [_cql_converter(arg) for arg in _split_type_args(args.removesuffix(">"))]
+
+        def _element(convert: Callable[[str], Any], value: Any) -> Any:
+            return convert(value) if isinstance(value, str) else value
+
+        if kind == "map":
+            key_converter, value_converter = arg_converters
+            return lambda text: {
+                key_converter(key): _element(value_converter, value)
+                for key, value in json.loads(text).items()
+            }
+        (element_converter,) = arg_converters
+        if kind == "set":
+            return lambda text: {_element(element_converter, value) for value in json.loads(text)}
+        return lambda text: [_element(element_converter, value) for value in json.loads(text)]
+    raise ValueError(f"Column type {cql_type!r} is not supported by native engine.")
+
+
+def _native_types_supported(column_types: Mapping[str, str]) -> bool:
+    """Return `True` if all column types are supported by native engine,
+    see `_cql_converter`.
+    """
+    try:
+        for cql_type in column_types.values():
+            _cql_converter(cql_type)
+    except ValueError:
+        return False
+    return True
+
+
+def _split_type_args(args: str) -> list[str]:
+    """Split comma-separated CQL type arguments, respecting nested types."""
+    result = []
+    depth = 0
+    start = 0
+    for idx, char in enumerate(args):
+        if char == "<":
+            depth += 1
+        elif char == ">":
+            depth -= 1
+        elif char == "," and depth == 0:
+            result.append(args[start:idx])
+            start = idx + 1
+    result.append(args[start:])
+    return result
+
+
+def _parse_timestamp(text: str) -> datetime.datetime:
+    """Parse timestamp in ISO format, timestamp without time zone is UTC."""
+    value = datetime.datetime.fromisoformat(text)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.UTC)
+    return value
+
+
+# Converters for CSV values of simple CQL types.
+_CQL_CONVERTERS: dict[str, Callable[[str], Any]] = {
+    "ascii": str,
+    "bigint": int,
+    "blob": base64.b64decode,
+    "boolean": lambda text: text.lower() == "true",
+    "date": datetime.date.fromisoformat,
+    "decimal": decimal.Decimal,
+    "double": float,
+    "float": float,
+    "inet": str,
+    "int": int,
+    "smallint": int,
+    "text": str,
+    "time": Time,
+    "timestamp": _parse_timestamp,
+    "timeuuid": uuid.UUID,
+    "tinyint": int,
+    "uuid": uuid.UUID,
+    "varchar": str,
+    "varint": int,
+}
+
+
+class _ColumnarWriter:
+    """Writer of a Parquet or Arrow IPC file, which converts a CSV data
+    stream produced by dsbulk into typed columns.
+
+    Parameters
+    ----------
+    file_format : `str`
+        Format of the file, "parquet" or "arrow".
+    file_obj : `typing.BinaryIO`
+        Output file.
+    column_types : `dict` [`str`, `str`]
+        CQL types of all table columns, indexed by column name, in the order
+        of columns in the file.
+    compression : `str` or `None`
+        Compression used inside the file, `None` for no compression.
+    compression_level : `int` or `None`
+        Compression level, `None` for a default level.
+
+    Notes
+    -----
+    CSV is parsed in blocks in a separate thread, see `_CsvBlockParser`.
+    Rows are accumulated and written as record batches of
+    ``_COLUMNAR_BATCH_ROWS`` rows. Columns with types that have no direct
+    Arrow equivalent are stored as strings in the format used by dsbulk. CQL
+    type of each column is saved in the metadata of its field.
+    """
+
+    def __init__(
+        self,
+        file_format: str,
+        file_obj: Any,
+        column_types: dict[str, str],
+        compression: str | None,
+        compression_level: int | None,
+    ):
+        self._parser = _CsvBlockParser()
+        fields = []
+        self._converters: list[Callable[[str], Any]] = []
+        for column, cql_type in column_types.items():
+            arrow_type, converter = _arrow_type(cql_type)
+            fields.append(pyarrow.field(column, arrow_type, metadata={"cql_type": cql_type}))
+            self._converters.append(converter)
+        self._schema = pyarrow.schema(fields)
+        sink = pyarrow.PythonFile(file_obj, mode="w")
+        if file_format == "parquet":
+            self._writer = pyarrow.parquet.ParquetWriter(
+                sink, self._schema, compression=compression or "none", compression_level=compression_level
+            )
+        else:
+            codec = pyarrow.Codec(compression, compression_level) if compression else None
+            options = pyarrow.ipc.IpcWriteOptions(compression=codec)
+            self._writer = pyarrow.ipc.new_file(sink, self._schema, options=options)
+        # Position of each file column in CSV rows, known after header.
+        self._index: list[int] | None = None
+        self._rows: list[list[str]] = []
+
+    async def feed(self, data: bytes) -> None:
+        """Parse next piece of the stream and write complete batches."""
+        self._add(await asyncio.to_thread(self._parser.feed, data))
+        while len(self._rows) >= _COLUMNAR_BATCH_ROWS:
+            rows = self._rows[:_COLUMNAR_BATCH_ROWS]
+            del self._rows[:_COLUMNAR_BATCH_ROWS]
+            await asyncio.to_thread(self._write, rows)
+
+    async def close(self) -> None:
+        """Write remaining rows and finalize the file."""
+        self._add(await asyncio.to_thread(self._parser.close))
+        if self._rows:
+            await asyncio.to_thread(self._write, self._rows)
+            self._rows = []
+        await asyncio.to_thread(self._writer.close)
+
+    def abort(self) -> None:
+        """Stop writing after a failure, file contents is incomplete."""
+        with suppress(Exception):
+            self._writer.close()
+
+    def _add(self, rows: list[list[str]]) -> None:
+        if rows and self._index is None:
+            header = rows.pop(0)
+            try:
+                self._index = [header.index(column) for column in self._schema.names]
+            except ValueError as exc:
+                raise ValueError(f"CSV header does not match table columns: {exc}") from None
+        self._rows += rows
+
+    def _write(self, rows: list[list[str]]) -> None:
+        """Convert rows to a record batch and write it."""
+        assert self._index is not None
+        arrays = []
+        for field, idx, convert in zip(self._schema, self._index, self._converters):
+            values = [row[idx] for row in rows]
+            arrays.append(
+                pyarrow.array(
+                    [
+                        None if value == "" else ("" if value == _CSV_EMPTY else convert(value))
+                        for value in values
+                    ],
+                    type=field.type,
+                )
+            )
+        self._writer.write_batch(pyarrow.RecordBatch.from_arrays(arrays, schema=self._schema))
+
+
+class _BlockWriter:
+    """Writer of pipeline output to a file in large blocks.
+
+    Parameters
+    ----------
+    file_obj : `typing.BinaryIO`
+        Output file.
+    block_size : `int`, optional
+        Amount of data to accumulate before writing it to the file.
+
+    Notes
+    -----
+    Accumulated chunks are passed to ``writelines`` in one call, they are not
+    joined into one block first; buffered file may still copy chunks that
+    are smaller than its buffer. Writes run in a separate thread, so that
+    slow storage does not stall other jobs; pipeline waits for the write to
+    finish, which limits memory use to one block.
+    """
+
+    def __init__(self, file_obj: BinaryIO, block_size: int = _WRITE_BLOCK_SIZE):
+        self._file_obj = file_obj
+        self._block_size = block_size
+        self._chunks: list[bytes] = []
+        self._size = 0
+
+    async def write(self, data: bytes) -> None:
+        """Add data, write accumulated data when a block is full."""
+        self._chunks.append(data)
+        self._size += len(data)
+        if self._size >= self._block_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write all accumulated data to the file."""
+        chunks, self._chunks, self._size = self._chunks, [], 0
+        if chunks:
+            await asyncio.to_thread(self._file_obj.writelines, chunks)
+
+
+class _ObservedFile:
+    """Output file wrapper which passes all written data to an observer.
+
+    Parameters
+    ----------
+    file_obj : `typing.BinaryIO`
+        Output file.
+    observer : `~collections.abc.Callable`
+        Function called with each piece of written data.
+    """
+
+    def __init__(self, file_obj: BinaryIO, observer: Callable[[bytes], None]):
+        self._file_obj = file_obj
+        self._observer = observer
+
+    @property
+    def closed(self) -> bool:
+        return self._file_obj.closed
+
+    def write(self, data: bytes) -> int:
+        self._observer(data)
+        return self._file_obj.write(data)
+
+    def tell(self) -> int:
+        return self._file_obj.tell()
+
+    def flush(self) -> None:
+        self._file_obj.flush()
+
+    def close(self) -> None:
+        # File is owned by the caller.
+        self._file_obj.flush()
+
+
+class _RangeFile(io.RawIOBase):
+    """Read-only seekable file representing a byte range in another file.
+
+    Parameters
+    ----------
+    handle : `lsst.resources.ResourceHandleProtocol`
+        Seekable handle of the file that contains the range.
+    offset : `int`
+        Offset of the range in the file.
+    size : `int`
+        Size of the range.
+    """
+
+    def __init__(self, handle: ResourceHandleProtocol, offset: int, size: int):
+        self._handle = handle
+        self._offset = offset
+        self._size = size
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, position: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            position += self._position
+        elif whence == io.SEEK_END:
+            position += self._size
+        self._position = min(max(position, 0), self._size)
+        return self._position
+
+    def read(self, size: int | None = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._size - self._position
+        size = min(size, self._size - self._position)
+        if size <= 0:
+            return b""
+        self._handle.seek(self._offset + self._position)
+        data = self._handle.read(size)
+        self._position += len(data)
+        return data
+
+
+async def _columnar_batches(
+    file_format: str, path: ResourcePath, offset: int, size: int
+) -> AsyncGenerator[Any]:
+    """Read record batches from a Parquet or Arrow IPC file stored as a byte
+    range in a local or remote file.
+
+    Only the parts of the file that are needed are read, remote files are
+    read with range requests.
+    """
+
+    def _open(handle: ResourceHandleProtocol) -> Iterator[Any]:
+        source = pyarrow.PythonFile(_RangeFile(handle, offset, size), mode="r")
+        if file_format == "parquet":
+            return pyarrow.parquet.ParquetFile(source).iter_batches(batch_size=_COLUMNAR_BATCH_ROWS)
+        reader = pyarrow.ipc.open_file(source)
+        return (reader.get_batch(idx) for idx in range(reader.num_record_batches))
+
+    with ExitStack() as stack:
+        handle = await asyncio.to_thread(stack.enter_context, path.open("rb"))
+        batches = await asyncio.to_thread(_open, handle)
+        while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+            yield batch
+
+
+async def _columnar_csv_chunks(batches: AsyncIterator[Any]) -> AsyncGenerator[bytes]:
+    """Convert record batches to CSV data in the format produced by dsbulk,
+    header is produced before the first batch.
+    """
+
+    def _csv_chunk(batch: Any) -> bytes:
+        columns = [column.to_pylist() for column in batch.columns]
+        return "".join([_csv_line(row) for row in zip(*columns)]).encode()
+
+    header = b""
+    async for batch in batches:
+        if not header:
+            header = (",".join(batch.schema.names) + "\n").encode()
+            yield header
+        if batch.num_rows:
+            yield await asyncio.to_thread(_csv_chunk, batch)
+
+
+def _arrow_type(cql_type: str) -> tuple[Any, Callable[[str], Any]]:
+    """Return Arrow type for a column of CQL type and a function which
+    converts CSV value to a value of that type.
+
+    Types that have no exact Arrow equivalent (e.g. varint, uuid, or
+    collections) are stored as strings.
+    """
+    arrow_types = {
+        "bigint": pyarrow.int64(),
+        "blob": pyarrow.binary(),
+        "boolean": pyarrow.bool_(),
+        "counter": pyarrow.int64(),
+        "date": pyarrow.date32(),
+        "double": pyarrow.float64(),
+        "float": pyarrow.float32(),
+        "int": pyarrow.int32(),
+        "smallint": pyarrow.int16(),
+        "timestamp": pyarrow.timestamp("ms", tz="UTC"),
+        "tinyint": pyarrow.int8(),
+    }
+    cql_type = cql_type.strip()
+    if (arrow_type := arrow_types.get(cql_type)) is not None:
+        return arrow_type, _CQL_CONVERTERS.get(cql_type, int)
+    return pyarrow.string(), str
+
+
+async def _read_byte_range(
+    path: ResourcePath, offset: int, size: int, prefetch: int
+) -> AsyncGenerator[bytes]:
+    """Read a range of bytes from a file in chunks.
+
+    Parameters
+    ----------
+    path : `lsst.resources.ResourcePath`
+        File location, local or remote.
+    offset : `int`
+        Offset of the first byte in the file.
+    size : `int`
+        Number of bytes to read.
+    prefetch : `int`
+        Number of chunks that are fetched concurrently ahead of consumer.
+
+    Yields
+    ------
+    chunk : `bytes`
+        Next chunk of data.
+    """
+    end = offset + size
+
+    def _read_chunk(position: int) -> bytes:
+        # Each range read uses its own handle, so they can run concurrently.
+        with path.open("rb") as handle:
+            handle.seek(position)
+            return handle.read(min(_READ_CHUNK_SIZE, end - position))
+
+    pending: deque[asyncio.Task[bytes]] = deque()
+    position = offset
+    try:
+        while position < end or pending:
+            while position < end and len(pending) < max(prefetch, 1):
+                pending.append(asyncio.create_task(asyncio.to_thread(_read_chunk, position)))
+                position += _READ_CHUNK_SIZE
+            yield await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _run_pipeline(
+    commands: list[list[str]],
+    *,
+    source: AsyncIterator[bytes] | None = None,
+    sink: Callable[[bytes], Any] | None = None,
+    observers: Sequence[Callable[[bytes], None] | None] = (),
+) -> None:
+    """Run a chain of processes, data between processes is copied by this
+    process.
+
+    Parameters
+    ----------
+    commands : `list` [`list` [`str`]]
+        Commands to run, output of each command is passed to the input of the
+        next one.
+    source : `~collections.abc.AsyncIterator` [`bytes`], optional
+        Data for the input of the first command, if `None` then the first
+        command reads nothing.
+    sink : `~collections.abc.Callable`, optional
+        Function called with the output of the last command, it can be a
+        coroutine function. If `None` then output is not redirected.
+    observers : `~collections.abc.Sequence`, optional
+        Functions called with the data passed through each link of the chain,
+        first link is between ``source`` and the first command, last link is
+        between the last command and ``sink``. Observers for missing links
+        are ignored.
+
+    Raises
+    ------
+    RuntimeError
+        Raised if any of the commands fails.
+
+    Notes
+    -----
+    Unlike a shell pipe, exit status of every command is checked, and the
+    data is seen by this process, e.g. to compute checksums.
+    """
+    n_links = len(commands) + 1
+    link_observers = list(observers)[:n_links] + [None] * (n_links - len(observers))
+    processes: list[asyncio.subprocess.Process] = []
+
+    async def _copy(
+        chunks: AsyncIterator[bytes],
+        writer: asyncio.StreamWriter | None,
+        observer: Callable[[bytes], None] | None,
+    ) -> None:
+        async for chunk in chunks:
+            if observer is not None:
+                observer(chunk)
+            if writer is None:
+                assert sink is not None
+                if inspect.isawaitable(result := sink(chunk)):
+                    await result
+            else:
+                # If reader exits this raises BrokenPipeError and the whole
+                # pipeline is stopped.
+                writer.write(chunk)
+                await writer.drain()
+        if writer is not None:
+            writer.close()
+            await writer.wait_closed()
+
+    async def _read_stream(reader: asyncio.StreamReader) -> AsyncIterator[bytes]:
+        while chunk := await reader.read(_PIPE_CHUNK_SIZE):
+            yield chunk
+
+    try:
+        for idx, cmd in enumerate(commands):
+            first, last = idx == 0, idx == len(commands) - 1
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE
+                if source is not None or not first
+                else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE if sink is not None or not last else None,
+            )
+            processes.append(process)
+
+        async with asyncio.TaskGroup() as group:
+            if source is not None:
+                writer = processes[0].stdin if processes else None
+                group.create_task(_copy(source, writer, link_observers[0]))
+            for idx, process in enumerate(processes):
+                if process.stdout is None:
+                    continue
+                writer = processes[idx + 1].stdin if idx + 1 < len(processes) else None
+                group.create_task(_copy(_read_stream(process.stdout), writer, link_observers[idx + 1]))
+            for process in processes:
+                group.create_task(process.wait())
+    except BaseException as exc:
+        # Upstream processes would block forever on their output if any
+        # downstream process exits, stop everything.
+        for process in processes:
+            if process.returncode is None:
+                process.kill()
+        await asyncio.gather(*[_discard_output(process) for process in processes])
+        if isinstance(exc, Exception):
+            # Failed command is a better explanation than a broken pipe.
+            for cmd, process in zip(commands, processes):
+                if process.returncode not in (0, -signal.SIGKILL):
+                    raise RuntimeError(
+                        f"Command {cmd[0]} failed: return code = {process.returncode}"
+                    ) from exc
+            if isinstance(exc, ExceptionGroup) and len(exc.exceptions) == 1:
+                raise exc.exceptions[0] from None
+        raise
+
+    for cmd, process in zip(commands, processes):
+        if process.returncode != 0:
+            raise RuntimeError(f"Command {cmd[0]} failed: return code = {process.returncode}")
+
+
+async def _discard_output(process: asyncio.subprocess.Process) -> None:
+    """Wait for process to finish, discarding its remaining output. Process
+    is not considered finished until its output pipe is closed.
+    """
+    if process.stdout is not None:
+        while await process.stdout.read(_PIPE_CHUNK_SIZE):
+            pass
+    await process.wait()
+
+
+def _schedule_jobs(data_file_sizes: list[tuple[_DataFile, int]], n_jobs: int) -> list[_DataFile]:
+    """Order data files for processing, largest first.
+
+    Parameters
+    ----------
+    data_file_sizes : `list` [`tuple` [`_DataFile`, `int`]]
+        Data files and their estimated sizes, size units are not important.
+    n_jobs : `int`
+        Number of concurrent jobs.
+
+    Returns
+    -------
+    data_files : `list` [`_DataFile`]
+        Data files in the order of processing.
+
+    Notes
+    -----
+    This is the longest-processing-time-first scheduling, it is not optimal
+    but keeps the biggest tables from starting last and delaying completion of
+    the whole job. Expected completion time is estimated by assigning each
+    file to the least loaded job slot, which is what happens at execution time
+    if processing time is proportional to size.
+    """
+    ordered = sorted(data_file_sizes, key=lambda item: (-item[1], item[0].file_name))
+
+    slots = [0] * n_jobs
+    for data_file, size in ordered:
+        idx = slots.index(min(slots))
+        slots[idx] += size
+        _LOG.debug("Scheduling %s, estimated size %d, job slot %d", data_file.file_name, size, idx)
+
+    total = sum(slots)
+    if total > 0:
+        # Ratio of the estimated total time to the time of perfectly balanced
+        # schedule, 1 is ideal.
+        ideal = total / min(n_jobs, len(ordered))
+        _LOG.info(
+            "Scheduled %d files in %d job slots, largest first: %s; expected balance: %.2f",
+            len(ordered),
+            n_jobs,
+            ", ".join(data_file.file_name for data_file, _ in ordered[:5])
+            + (", ..." if len(ordered) > 5 else ""),
+            max(slots) / ideal,
+        )
+    else:
+        _LOG.info("No size estimates for %d files, using alphabetical order.", len(ordered))
+
+    return [data_file for data_file, _ in ordered]
+
+
+def _is_empty_file(source: _DumpSource, file_name: str, size: int, codec: _Codec) -> bool:
+    """Check whether data file has no data after decompression."""
+    if not codec.decompress_cmd:
+        return size == 0
+    # Compressed empty file is tiny, anything large has some data in it.
+    if size > _EMPTY_COMPRESSED_SIZE:
+        return False
+    data = source.read(file_name)
+    if codec.extension == ".gz":
+        return not gzip.decompress(data)
+    # Run decompression tool.
+    result = subprocess.run(codec.decompress_cmd, input=data, capture_output=True, check=True)
+    return not result.stdout
+
+
+def _manifest_data_files(manifest: list[str]) -> dict[str, list[_DataFile]]:
+    """Group data files listed in manifest by table name, shards are ordered
+    by their shard number.
+    """
+    table_files: dict[str, list[_DataFile]] = {}
+    for file_name in manifest:
+        if (data_file := _DataFile.from_file_name(file_name)) is not None:
+            table_files.setdefault(data_file.table, []).append(data_file)
+    for data_files in table_files.values():
+        data_files.sort(key=lambda data_file: -1 if data_file.shard is None else data_file.shard)
+    return table_files
+
+
+def _manifest_metadata(file_infos: Iterable[_FileInfo]) -> str:
+    """Return JSON representation of data file metadata."""
+    files = [dataclasses.asdict(info) for info in sorted(file_infos, key=lambda info: info.name)]
+    return json.dumps({"version": 1, "files": files}, indent=1)
+
+
+def _read_manifest_metadata(data: bytes) -> dict[str, _FileInfo]:
+    """Parse JSON representation of data file metadata, return metadata
+    indexed by file name.
+    """
+    metadata = json.loads(data)
+    if not isinstance(metadata, dict) or metadata.get("version") != 1:
+        raise ValueError("Unexpected format of manifest.json.")
+    return {record["name"]: _FileInfo(**record) for record in metadata["files"]}
+
+
+def _base_dump_files(base: _DumpSource) -> tuple[dict[str, str], dict[str, tuple[str, list[str]]]]:
+    """Read schema of a base dump for incremental dump and find where data
+    of each table is.
+
+    Returns
+    -------
+    schema : `dict` [`str`, `str`]
+        Schema of the tables in the base dump.
+    table_files : `dict` [`str`, `tuple` [`str`, `list` [`str`]]]
+        Location of the dump with the data of each table and names of data
+        files. If base dump is incremental, data of some tables is in the
+        earlier dumps.
+    """
+    if not base.exists("manifest.txt"):
+        raise ValueError(f"Manifest file does not exist in base dump {base.location}, it may be incomplete.")
+    manifest = [line.strip() for line in base.read("manifest.txt").decode().splitlines() if line.strip()]
+    schema = json.loads(base.read("schema.json"))
+    base_url = base.location.geturl()
+    table_files = {
+        table: (base_url, [data_file.file_name for data_file in data_files])
+        for table, data_files in _manifest_data_files(manifest).items()
+    }
+    if _INCREMENTAL in manifest:
+        incremental_info = json.loads(base.read(_INCREMENTAL))
+        for location, file_names in incremental_info["files"].items():
+            for table, data_files in _manifest_data_files(file_names).items():
+                table_files[table] = (location, [data_file.file_name for data_file in data_files])
+    return schema, table_files
+
+
+def _newest_partitions(tables: Iterable[str]) -> dict[str, int]:
+    """Return the newest time partition number for each time-partitioned
+    table.
+    """
+    newest: dict[str, int] = {}
+    for table in tables:
+        if match := _TIME_PARTITION_RE.fullmatch(table):
+            newest[match[1]] = max(newest.get(match[1], -1), int(match[2]))
+    return newest
+
+
+def _carried_tables(
+    schema: dict[str, str], base_schema: dict[str, str], base_files: dict[str, tuple[str, list[str]]]
+) -> set[str]:
+    """Return names of the tables whose data is taken from base dump by
+    incremental dump.
+
+    Only time partitions older than the newest partition in the base dump are
+    carried, the newest partition could still receive data after the base
+    dump was made. Tables whose schema changed since the base dump are dumped
+    again.
+    """
+    newest = _newest_partitions(base_schema)
+    carried = set()
+    for table, statement in schema.items():
+        match = _TIME_PARTITION_RE.fullmatch(table)
+        if match is None or table not in base_files or int(match[2]) >= newest[match[1]]:
+            continue
+        if base_schema[table] != statement:
+            _LOG.info("Schema of table %s changed since base dump, table will be dumped.", table)
+            continue
+        carried.add(table)
+    return carried
+
+
+def _walk_files(path: ResourcePath) -> Iterator[ResourcePath]:
+    """Find all files in a specified directory."""
+    for rp, _, files in path.walk():
+        for file_name in files:
+            yield rp.join(file_name)
+
+
+class _BundleWriter:
+    """Writer for tar or zip archive which adds members one at a time.
+
+    Parameters
+    ----------
+    bundle : `str`
+        Archive type, "tar" or "zip".
+    fileobj : `typing.BinaryIO`
+        File object to write archive to, it does not need to be seekable.
+    """
+
+    def __init__(self, bundle: Literal["tar", "zip"], fileobj: BinaryIO):
+        self._tar: tarfile.TarFile | None = None
+        self._zip: zipfile.ZipFile | None = None
+        # Data offset and size for each regular file in tar archive, used to
+        # access members without scanning the whole archive.
+        self.index: dict[str, tuple[int, int]] = {}
+        # We are not compressing archives, bulk of data is already compressed.
+        if bundle == "tar":
+            # Stream mode only writes sequentially.
+            self._tar = tarfile.open(fileobj=fileobj, mode="w|")
+        elif bundle == "zip":
+            # Zip switches to data descriptors if output is not seekable.
+            self._zip = zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_STORED)
+        else:
+            raise ValueError(f"Unexpected bundle type {bundle}")
+
+    def __enter__(self) -> _BundleWriter:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def add(self, path: str, name: str) -> None:
+        """Add a file or a whole directory to archive.
+
+        Parameters
+        ----------
+        path : `str`
+            Local path to a file or directory.
+        name : `str`
+            Name of the member in archive.
+        """
+        if self._tar is not None:
+            start = self._tar.offset
+            self._tar.add(path, name)
+            if os.path.isfile(path):
+                # Data ends at the current offset, padded to block size.
+                size = os.stat(path).st_size
+                padded_size = -(-size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+                self.index[name] = (self._tar.offset - padded_size, size)
+                assert self.index[name][0] > start, "Unexpected tar header size"
+        elif self._zip is not None:
+            if os.path.isdir(path):
+                for dir_path, _, files in os.walk(path):
+                    for file_name in files:
+                        file_path = os.path.join(dir_path, file_name)
+                        self._zip.write(file_path, os.path.join(name, os.path.relpath(file_path, path)))
+            else:
+                self._zip.write(path, name)
+
+    def close(self) -> None:
+        """Write archive trailer, does not close file object."""
+        if self._tar is not None:
+            self._tar.close()
+        elif self._zip is not None:
+            self._zip.close()
+
+
+class _PartWriter:
+    """Wrapper for a remote resource handle which triggers upload of the
+    buffered data in parts of a fixed size.
+
+    Parameters
+    ----------
+    handle : `lsst.resources.ResourceHandleProtocol`
+        Resource handle open for writing.
+    part_size : `int`
+        Size of the upload part.
+    """
+
+    def __init__(self, handle: ResourceHandleProtocol, part_size: int):
+        self._handle = handle
+        self._part_size = part_size
+        self._buffered = 0
+
+    def write(self, data: bytes) -> int:
+        size = self._handle.write(data)
+        self._buffered += size
+        if self._buffered >= self._part_size:
+            self._handle.flush()
+            self._buffered = 0
+        return size
+
+    def flush(self) -> None:
+        # Flushing is controlled by part size, remaining data is flushed when
+        # handle is closed.
+        pass
+
+
+@contextmanager
+def _open_bundle(
+    bundle: Literal["tar", "zip"], destination: ResourcePath, tmp_path: ResourcePath
+) -> Iterator[_BundleWriter]:
+    """Open archive for incremental writing.
+
+    Local archive is written directly to its final location. For S3 the
+    archive is streamed as a multipart upload and is never stored locally,
+    for other remote destinations it is created in a temporary folder and
+    transferred after it is complete. Partial archive is removed on errors.
+    """
+    local_path: ResourcePath | None
+    if destination.isLocal:
+        local_path = destination
+    elif destination.scheme == "s3":
+        local_path = None
+    else:
+        local_path = tmp_path.join(destination.basename())
+    try:
+        if local_path is None:
+            _LOG.info("Streaming %s archive to %s", bundle, destination)
+            with destination.open("wb") as handle:
+                with _BundleWriter(bundle, cast(BinaryIO, _PartWriter(handle, _STREAM_PART_SIZE))) as writer:
+                    yield writer
+        else:
+            _LOG.info("Creating %s archive %s", bundle, local_path)
+            with open(local_path.ospath, "wb") as file:
+                with _BundleWriter(bundle, file) as writer:
+                    yield writer
+            if local_path != destination:
+                _LOG.info("Transferring bundle to %s", destination)
+                destination.transfer_from(local_path, transfer="move", overwrite=True)
+        if writer.index:
+            # Tar index is written next to archive.
+            index_path = _bundle_index_path(destination)
+            _LOG.info("Writing archive index %s", index_path)
+            index_path.write(json.dumps(writer.index).encode(), overwrite=True)
+    except BaseException:
+        # Delete partial archive on any errors.
+        for path in (local_path, destination):
+            try:
+                if path is not None and path.exists():
+                    path.remove()
+            except Exception:
+                pass
+        raise
+
+
+class _DumpSource:
+    """Reader for the files in a dump, dump can be a directory or an archive,
+    either local or remote.
+
+    Parameters
+    ----------
+    location : `str`
+        Location of a dump directory or archive, archive is recognized by
+        its extension.
+
+    Notes
+    -----
+    Archive members are accessed directly by their byte range in the archive.
+    Zip archive has a central directory with member offsets. Tar archive does
+    not have one, if the archive has a sidecar index file written by dump
+    then offsets are read from that file, otherwise tar headers are scanned
+    when the source is created.
+    """
+
+    def __init__(self, location: str):
+        self.bundle: Literal["tar", "zip"] | None = None
+        extension = ResourcePath(location).getExtension().lower()
+        if extension == ".tar":
+            self.bundle = "tar"
+        elif extension == ".zip":
+            self.bundle = "zip"
+
+        # For archives this is mapping from member name to its offset and
+        # size, offset is for data in tar, and for local header in zip.
+        self._members: dict[str, tuple[int, int]] = {}
+        if self.bundle is None:
+            self.location = ResourcePath(location, forceDirectory=True)
+            if self.location.isLocal and not os.path.isdir(self.location.ospath):
+                raise ValueError(f"Folder {location!r} does not exist or is not a directory.")
+        else:
+            self.location = ResourcePath(location)
+            if not self.location.exists():
+                raise ValueError(f"Archive {location!r} does not exist.")
+            if self.bundle == "tar":
+                self._members = self._tar_members()
+            else:
+                self._members = self._zip_members()
+
+    @property
+    def local_dir(self) -> str | None:
+        """Path to a local dump directory, `None` if dump is remote or is
+        an archive (`str` or `None`).
+        """
+        if self.bundle is None and self.location.isLocal:
+            return self.location.ospath
+        return None
+
+    def exists(self, name: str) -> bool:
+        """Check that file exists in the dump."""
+        if self.bundle is None:
+            return self.location.join(name).exists()
+        return name in self._members
+
+    def size(self, name: str) -> int:
+        """Return size of a file in the dump."""
+        if self.bundle is None:
+            return self.location.join(name).size()
+        return self._members[name][1]
+
+    def read(self, name: str) -> bytes:
+        """Return complete contents of a file in the dump."""
+        if self.bundle is None:
+            return self.location.join(name).read()
+        path, offset, size = self.byte_range(name)
+        with path.open("rb") as handle:
+            handle.seek(offset)
+            return handle.read(size)
+
+    def byte_range(self, name: str) -> tuple[ResourcePath, int, int]:
+        """Return location of the file data as a byte range in a file.
+
+        Returns
+        -------
+        path : `lsst.resources.ResourcePath`
+            Location of a file which contains the data.
+        offset : `int`
+            Offset of data in the file.
+        size : `int`
+            Size of data.
+        """
+        if self.bundle is None:
+            path = self.location.join(name)
+            return path, 0, path.size()
+        offset, size = self._members[name]
+        if self.bundle == "zip":
+            # Data follows local header which has variable size.
+            with self.location.open("rb") as handle:
+                handle.seek(offset)
+                header = handle.read(_ZIP_LOCAL_HEADER.size)
+            *_, name_length, extra_length = _ZIP_LOCAL_HEADER.unpack(header)
+            offset += _ZIP_LOCAL_HEADER.size + name_length + extra_length
+        return self.location, offset, size
+
+    def _tar_members(self) -> dict[str, tuple[int, int]]:
+        """Read tar index file or scan tar headers."""
+        index_path = _bundle_index_path(self.location)
+        if index_path.exists():
+            _LOG.info("Reading archive index %s", index_path)
+            index = json.loads(index_path.read())
+            return {name: (offset, size) for name, (offset, size) in index.items()}
+        _LOG.info("Archive index is missing, scanning archive %s", self.location)
+        members = {}
+        with self.location.open("rb") as handle:
+            with tarfile.open(fileobj=cast(BinaryIO, handle), mode="r:") as tar:
+                for info in tar:
+                    if info.isfile():
+                        members[info.name] = (info.offset_data, info.size)
+        return members
+
+    def _zip_members(self) -> dict[str, tuple[int, int]]:
+        """Read zip central directory."""
+        members = {}
+        with self.location.open("rb") as handle:
+            with zipfile.ZipFile(cast(BinaryIO, handle)) as archive:
+                for info in archive.infolist():
+                    if info.compress_type != zipfile.ZIP_STORED:
+                        raise ValueError(f"Archive member {info.filename} is compressed, cannot read it.")
+                    members[info.filename] = (info.header_offset, info.file_size)
+        return members
+
+
+def _bundle_index_path(bundle_path: ResourcePath) -> ResourcePath:
+    """Return location of the archive index file."""
+    return bundle_path.updatedFile(bundle_path.basename() + ".index.json")
+
+
+async def _table_schema(session: Session, keyspace: str, table_patterns: list[str]) -> dict[str, str]:
+    """Extract schema definition for all tables to be dumped.
+
+    Returns a dict with a table name as a key and "CREATE TABLE" template as a
+    value.
+    """
+    # Check that keyspace exists.
+    query = "SELECT keyspace_name FROM system_schema.keyspaces WHERE keyspace_name = %s"
+    result = session.execute(query, [keyspace])
+    if not result:
+        raise ValueError(f"Keyspace {keyspace!r} does not exist.")
+
+    # Get the list of tables.
+    tables = sorted(_keyspace_tables(session, keyspace))
+    if not tables:
+        raise ValueError(f"Keyspace {keyspace!r} does not have any tables.")
+    if table_patterns:
+        tables = _match_tables(tables, table_patterns)
+
+    # Dump schema for all tables but do not include CREATE KEYSPACE. With
+    # many tables sequential queries take a long time, run them concurrently.
+    semaphore = asyncio.Semaphore(_DESCRIBE_CONCURRENCY)
+
+    async def _describe(table: str) -> str:
+        query = f'DESCRIBE "{keyspace}"."{table}"'
+        async with semaphore:
+            rows = await _execute_async(session, query)
+        return _replace_ks_name(rows[0].create_statement)
+
+    table_schemas = await asyncio.gather(*[_describe(table) for table in tables])
+    return dict(zip(tables, table_schemas))
+
+
+def _match_tables(tables: Iterable[str], table_patterns: list[str]) -> list[str]:
+    """Return sorted list of table names matching any of the patterns, raise
+    an exception if any pattern does not match anything.
+    """
+    matched: set[str] = set()
+    for pattern in table_patterns:
+        if matching_tables := fnmatch.filter(tables, pattern):
+            matched.update(matching_tables)
+        else:
+            raise ValueError(f"Pattern {pattern!r} does not match any table name.")
+    return sorted(matched)
+
+
+def _partition_keys(session: Session, keyspace: str, tables: list[str]) -> dict[str, list[str]]:
+    """Return partition key columns for each table, in their key order."""
+    query = (
+        "SELECT table_name, column_name, kind, position FROM system_schema.columns WHERE keyspace_name = %s"
+    )
+    result = session.execute(query, [keyspace])
+    columns: dict[str, list[tuple[int, str]]] = {}
+    for table_name, column_name, kind, position in result:
+        if kind == "partition_key":
+            columns.setdefault(table_name, []).append((position, column_name))
+    return {table: [name for _, name in sorted(columns[table])] for table in tables}
+
+
+def _table_columns(session: Session, keyspace: str, tables: list[str]) -> dict[str, list[str]]:
+    """Return names of all columns for each table, primary key columns are
+    first, in their key order.
+    """
+    query = (
+        "SELECT table_name, column_name, kind, position FROM system_schema.columns WHERE keyspace_name = %s"
+    )
+    result = session.execute(query, [keyspace])
+    kind_order = {"partition_key": 0, "clustering": 1}
+    columns: dict[str, list[tuple[int, int, str]]] = {}
+    for table_name, column_name, kind, position in result:
+        columns.setdefault(table_name, []).append((kind_order.get(kind, 2), position, column_name))
+    return {table: [name for *_, name in sorted(columns[table])] for table in tables}
+
+
+def _column_types(session: Session, keyspace: str, tables: list[str]) -> dict[str, dict[str, str]]:
+    """Return CQL types of all columns for each table."""
+    query = "SELECT table_name, column_name, type FROM system_schema.columns WHERE keyspace_name = %s"
+    result = session.execute(query, [keyspace])
+    types: dict[str, dict[str, str]] = {}
+    for table_name, column_name, cql_type in result:
+        types.setdefault(table_name, {})[column_name] = cql_type
+    return {table: types[table] for table in tables}
+
+
+def _table_size_estimates(session: Session, keyspace: str) -> dict[str, int]:
+    """Return estimated size of each table in bytes.
+
+    Estimates come from ``system.size_estimates`` table which only covers
+    token ranges owned by the coordinator node, they are scaled to the whole
+    token ring by the fraction of the ring covered by these ranges. This is
+    still an approximation, which assumes that data is evenly distributed
+    over the ring.
+    """
+    query = (
+        "SELECT table_name, range_start, range_end, mean_partition_size, partitions_count "
+        "FROM system.size_estimates WHERE keyspace_name = %s"
+    )
+    result = session.execute(query, [keyspace])
+    ring_size = _MAX_TOKEN - _MIN_TOKEN + 1
+    sizes: dict[str, int] = {}
+    covered: dict[str, int] = {}
+    for table_name, range_start, range_end, mean_partition_size, partitions_count in result:
+        sizes[table_name] = sizes.get(table_name, 0) + (mean_partition_size or 0) * (partitions_count or 0)
+        # Range can wrap around the end of the ring, equal bounds mean the
+        # whole ring.
+        width = (int(range_end) - int(range_start)) % ring_size or ring_size
+        covered[table_name] = covered.get(table_name, 0) + width
+    return {table: size * ring_size // min(covered[table], ring_size) for table, size in sizes.items()}
+
+
+def _split_token_range(
+    shards: int, token_range: tuple[int, int] = (_MIN_TOKEN, _MAX_TOKEN)
+) -> list[tuple[int, int]]:
+    """Split Murmur3 token range, full range by default, into a number of
+    equal sub-ranges.
+
+    Lower bound of each range is exclusive, upper bound is inclusive.
+
+    Raises
+    ------
+    ValueError
+        Raised if range has fewer tokens than the number of sub-ranges.
+    """
+    start, end = token_range
+    if shards > end - start:
+        raise ValueError(f"Token range ({start}, {end}] cannot be split into {shards} sub-ranges.")
+    step = (end - start) // shards
+    bounds = [start + step * i for i in range(shards)] + [end]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _sample_token_range(fraction: float) -> tuple[int, int]:
+    """Return sub-range of Murmur3 token ring covering a fraction of it.
+
+    The range starts at the beginning of the ring, so samples with a smaller
+    fraction are subsets of samples with a larger fraction.
+
+    Raises
+    ------
+    ValueError
+        Raised if fraction is too small to include any tokens.
+    """
+    end = _MIN_TOKEN + int((_MAX_TOKEN - _MIN_TOKEN) * fraction)
+    if end <= _MIN_TOKEN:
+        raise ValueError(f"Sample fraction {fraction} is too small, sample would be empty.")
+    return _MIN_TOKEN, min(end, _MAX_TOKEN)
+
+
+def _token_range_query(
+    keyspace: str, table: str, partition_key: list[str], token_range: tuple[int, int]
+) -> str:
+    """Make a query which selects all rows in a token range."""
+    token = "token(" + ", ".join(f'"{column}"' for column in partition_key) + ")"
+    start, end = token_range
+    return f'SELECT * FROM "{keyspace}"."{table}" WHERE {token} > {start} AND {token} <= {end}'
+
+
+def _dsbulk_unload_command(
+    host: str,
+    port: int,
+    keyspace: str,
+    data_file: _DataFile,
+    partition_key: list[str],
+    log_dir: str,
+    username: str | None,
+    password: str | None,
+) -> list[str]:
+    """Make command to dump table data, or one token-range shard of the
+    table, in CSV format to stdout.
+    """
+    cmd = [
+        "dsbulk",
+        "unload",
+        "-h",
+        f'["{host}"]',
+        "-port",
+        str(port),
+        "-k",
+        keyspace,
+        "-logDir",
+        log_dir,
+        "--log.verbosity",
+        "quiet",
+    ]
+    if data_file.token_range is None:
+        cmd += ["-t", data_file.table]
+    else:
+        cmd += ["-query", _token_range_query(keyspace, data_file.table, partition_key, data_file.token_range)]
+    if username:
+        cmd += ["-u", username]
+    if password:
+        cmd += ["-p", password, "--driver.advanced.auth-provider.class=PlainTextAuthProvider"]
+    return cmd
+
+
+def _dsbulk_load_command(
+    host: str,
+    port: int,
+    keyspace: str,
+    table: str,
+    log_dir: str,
+    username: str | None,
+    password: str | None,
+    max_concurrent_queries: str | None,
+) -> list[str]:
+    """Make command to load table data in CSV format from stdin."""
+    cmd = [
+        "dsbulk",
+        "load",
+        "-h",
+        f'["{host}"]',
+        "-port",
+        str(port),
+        "-k",
+        keyspace,
+        "-t",
+        table,
+        "-logDir",
+        log_dir,
+        "--log.verbosity",
+        "quiet",
+    ]
+    if username:
+        cmd += ["-u", username]
+    if password:
+        cmd += ["-p", password, "--driver.advanced.auth-provider.class=PlainTextAuthProvider"]
+    if max_concurrent_queries:
+        cmd += ["--engine.maxConcurrentQueries", max_concurrent_queries]
+    return cmd
+
+
+def _check_dsbulk() -> None:
+    """Check that dsbulk application can be executed."""
+    try:
+        subprocess.run(("dsbulk", "--version"), capture_output=True)
+    except Exception as exc:
+        raise RuntimeError(f"Failed to execute dsbulk, check $PATH: {exc}") from None
+
+
+def _check_codec(cmd: tuple[str, ...]) -> None:
+    """Check that compression tool can be found."""
+    if cmd and shutil.which(cmd[0]) is None:
+        raise RuntimeError(f"Failed to find compression tool {cmd[0]}, check $PATH.")
+
+
+def _check_pyarrow(file_format: str) -> None:
+    """Check that pyarrow is available for columnar file format."""
+    if pyarrow is None:
+        raise ImportError(f"Data file format {file_format!r} needs pyarrow package, which is not installed.")
+
+
+def _check_format(file_format: str, codec: str) -> None:
+    """Check that data files can be written in a given format with a given
+    codec.
+
+    Raises
+    ------
+    ValueError
+        Raised if format or codec is unknown, or the codec cannot be used
+        with the format.
+    RuntimeError
+        Raised if compression tool is not found.
+    ImportError
+        Raised if pyarrow is needed but not installed.
+    """
+    if codec not in _CODECS:
+        raise ValueError(f"Unexpected compression codec: {codec}.")
+    if file_format not in _FORMATS:
+        raise ValueError(f"Unexpected data file format: {file_format}.")
+    if file_format == "csv":
+        _check_codec(_CODECS[codec].compress_cmd)
+    else:
+        _check_pyarrow(file_format)
+        if file_format == "arrow" and _CODECS[codec].columnar not in ("zstd", None):
+            raise ValueError(f"Codec {codec} is not supported for Arrow IPC format, use zstd or none.")
+
+
+def _make_auth_provider(username: str | None, password: str | None) -> AuthProvider | None:
     """Make Cassandra authentication provider instance."""
     if username and password:
         return PlainTextAuthProvider(username=username, password=password)
     return None
 
 
-def _make_cluster(hosts: list[str], port: int, username: str | None, password: str | None) -> Cluster:
-    # Use first two hosts for contact points.
-    contact_points = hosts[:2]
+def _make_cluster(
+    hosts: list[str],
+    port: int,
+    username: str | None,
+    password: str | None,
+    max_schema_agreement_wait: float = 10,
+) -> Cluster:
+    # All hosts are contact points, requests are routed to replicas in the
+    # data center of the first reachable contact point.
     return Cluster(
-        contact_points=contact_points,
+        contact_points=hosts,
         port=port,
         auth_provider=_make_auth_provider(username, password),
-        load_balancing_policy=RoundRobinPolicy(),
+        load_balancing_policy=TokenAwarePolicy(DCAwareRoundRobinPolicy()),
         protocol_version=5,
+        max_schema_agreement_wait=max_schema_agreement_wait,
     )
 
 
 def _keyspace_tables(session: Session, keyspace: str) -> list[str]:
     """Get the list of tables in a keyspace."""
-    query = "SELECT table_name FROM system_schema.tables WHERE keyspace_name = '%s'"
+    query = "SELECT table_name FROM system_schema.tables WHERE keyspace_name = %s"
     result = session.execute(query, [keyspace])
     return [row[0] for row in result]
 
@@ -0,0 +1,378 @@
+# This file is part of dax_apdb_deploy.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import csv
+import os
+import random
+import tarfile
+import tempfile
+import time
+import unittest
+import zipfile
+
+from lsst.dax.apdb_deploy.scripts import _clone_keyspace
+from lsst.resources import ResourcePath
+
+# Values that need quoting or escaping, None is a null.
+_VALUES = [
+    "plain",
+    "",
+    None,
+    "a\\",
+    "C:\\dir\\",
+    "\\",
+    "\\\\",
+    '"',
+    '\\"',
+    'say "hi"',
+    "a,b",
+    "line\nbreak",
+    "crlf\r\nend",
+    '\\,"\n\\',
+]
+
+
+class CsvRoundTripTestCase(unittest.TestCase):
+    """Tests for CSV writing, parsing and row counting."""
+
+    def setUp(self) -> None:
+        self.rows = [[str(idx), value, _VALUES[-1 - idx]] for idx, value in enumerate(_VALUES)]
+        header = "id,value,other\n"
+        self.data = (header + "".join(_clone_keyspace._csv_line(row) for row in self.rows)).encode()
+        # Nulls are parsed as empty fields, empty strings as placeholder.
+        self.expected = [
+            ["" if value is None else (_clone_keyspace._CSV_EMPTY if value == "" else value) for value in row]
+            for row in self.rows
+        ]
+
+    def test_parse(self) -> None:
+        """Test that parsed values are the same as written values."""
+        parsed = _clone_keyspace._parse_csv(self.data.decode())
+        self.assertEqual(parsed[1:], self.expected)
+
+    def test_counter(self) -> None:
+        """Test row count, with the stream split at every position."""
+        for split in range(len(self.data) + 1):
+            counter = _clone_keyspace._CsvCounter()
+            counter.update(self.data[:split])
+            counter.update(self.data[split:])
+            self.assertEqual(counter.rows, len(self.rows), f"split at {split}")
+            self.assertEqual(counter.size, len(self.data))
+
+    def test_block_parser(self) -> None:
+        """Test parsing of the stream in pieces of different size."""
+        for size in (1, 2, 3, 7, 64, len(self.data)):
+            parser = _clone_keyspace._CsvBlockParser()
+            parsed = []
+            for start in range(0, len(self.data), size):
+                parsed += parser.feed(self.data[start : start + size])
+            parsed += parser.close()
+            self.assertEqual(parsed[1:], self.expected, f"piece size {size}")
+
+    def test_block_parser_error(self) -> None:
+        """Test that complete records which cannot be parsed raise
+        immediately.
+        """
+        parser = _clone_keyspace._CsvBlockParser()
+        self.assertEqual(parser.feed(b'id,value\n1,"a"\n2,b'), [["id", "value"], ["1", "a"]])
+        with self.assertRaises(csv.Error):
+            parser.feed(b'\n3,"a"b\n4,c\n')
+
+    def test_block_parser_limit(self) -> None:
+        """Test that unterminated quoted value does not grow the buffer
+        without limit.
+        """
+        parser = _clone_keyspace._CsvBlockParser(max_record_size=1000)
+        self.assertEqual(parser.feed(b'id,value\n1,"a\\"\n'), [["id", "value"]])
+        with self.assertRaises(csv.Error):
+            for _ in range(1000):
+                parser.feed(b"2,b\n")
+
+    def test_counter_bytewise(self) -> None:
+        """Test row count when stream comes one byte at a time."""
+        counter = _clone_keyspace._CsvCounter()
+        for idx in range(len(self.data)):
+            counter.update(self.data[idx : idx + 1])
+        self.assertEqual(counter.rows, len(self.rows))
+
+
+class CodecTestCase(unittest.TestCase):
+    """Tests for compression codec options."""
+
+    def test_check_level(self) -> None:
+        """Test validation of compression levels."""
+        codecs = _clone_keyspace._CODECS
+        for name, level in (("gzip", 1), ("gzip", 9), ("pigz", 6), ("zstd", 19), ("none", None)):
+            codecs[name].check_level(level)
+        for name, level in (("gzip", 12), ("gzip", 0), ("zstd", 20), ("none", 3)):
+            with self.assertRaises(ValueError):
+                codecs[name].check_level(level)
+
+    def test_compress_command(self) -> None:
+        """Test compression level option of the command."""
+        codec = _clone_keyspace._CODECS["zstd"]
+        self.assertEqual(codec.compress_command(None)[-1], "-3")
+        self.assertEqual(codec.compress_command(19)[-1], "-19")
+        self.assertEqual(_clone_keyspace._CODECS["none"].compress_command(None), [])
+
+
+class DataFileTestCase(unittest.TestCase):
+    """Tests for data file names."""
+
+    def test_round_trip(self) -> None:
+        """Test that file name is parsed back into the same description."""
+        DataFile = _clone_keyspace._DataFile
+        data_files = [
+            DataFile("DiaObject", shard, codec=codec)
+            for shard in (None, 0, 12)
+            for codec in ("gzip", "zstd", "none")
+        ]
+        data_files += [
+            DataFile("DiaSource", shard, codec="none", file_format=file_format)
+            for shard in (None, 3)
+            for file_format in ("parquet", "arrow")
+        ]
+        for data_file in data_files:
+            self.assertEqual(DataFile.from_file_name(data_file.file_name), data_file, data_file.file_name)
+
+    def test_names(self) -> None:
+        """Test parsing of specific names."""
+        DataFile = _clone_keyspace._DataFile
+        self.assertEqual(DataFile.from_file_name("DiaObject.csv.gz"), DataFile("DiaObject"))
+        self.assertEqual(DataFile.from_file_name("DiaObject.7.csv.gz"), DataFile("DiaObject", 7))
+        self.assertEqual(DataFile.from_file_name("DiaObject.csv"), DataFile("DiaObject", codec="none"))
+        # Token range is not a part of the name.
+        self.assertEqual(DataFile("T", 1, (0, 10)).file_name, "T.1.csv.gz")
+        for name in ("schema.json", "manifest.txt", "report.json", "T.x.csv.gz", "T.csv.bz2", "_dsbulk_log"):
+            self.assertIsNone(DataFile.from_file_name(name), name)
+
+
+class DumpSourceTestCase(unittest.TestCase):
+    """Tests for reading files from dump archives."""
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        # Sizes around tar block size, long name needs extended tar header.
+        rng = random.Random(1)
+        self.files = {
+            "schema.json": b"{}",
+            "Empty.csv.gz": b"",
+            "DiaObject.0.csv.gz": rng.randbytes(511),
+            "DiaObject.1.csv.gz": rng.randbytes(512),
+            "DiaObject.2.csv.gz": rng.randbytes(513),
+            "DiaSource.csv.zst": rng.randbytes(100_000),
+            "T" * 120 + ".csv": rng.randbytes(1000),
+        }
+        self.data_dir = os.path.join(self.tmp_dir.name, "data")
+        os.makedirs(self.data_dir)
+        for name, data in self.files.items():
+            with open(os.path.join(self.data_dir, name), "wb") as file:
+                file.write(data)
+
+    def _check(self, location: str) -> None:
+        source = _clone_keyspace._DumpSource(location)
+        for name, data in self.files.items():
+            self.assertTrue(source.exists(name))
+            self.assertEqual(source.size(name), len(data), name)
+            self.assertEqual(source.read(name), data, name)
+            path, offset, size = source.byte_range(name)
+            with open(path.ospath, "rb") as file:
+                file.seek(offset)
+                self.assertEqual(file.read(size), data, name)
+        self.assertFalse(source.exists("missing.csv.gz"))
+
+    def test_bundle(self) -> None:
+        """Test reading archives written by dump, tar is read with and
+        without index.
+        """
+        for bundle in ("tar", "zip"):
+            location = os.path.join(self.tmp_dir.name, f"dump.{bundle}")
+            tmp_path = ResourcePath(self.tmp_dir.name, forceDirectory=True)
+            with _clone_keyspace._open_bundle(bundle, ResourcePath(location), tmp_path) as writer:
+                for name in self.files:
+                    writer.add(os.path.join(self.data_dir, name), name)
+            self._check(location)
+            if bundle == "tar":
+                index_path = _clone_keyspace._bundle_index_path(ResourcePath(location))
+                self.assertTrue(index_path.exists())
+                index_path.remove()
+                self._check(location)
+
+    def test_stdlib_archives(self) -> None:
+        """Test reading archives written by other tools."""
+        location = os.path.join(self.tmp_dir.name, "other.tar")
+        with tarfile.open(location, "w") as tar:
+            for name in self.files:
+                tar.add(os.path.join(self.data_dir, name), name)
+        self._check(location)
+
+        location = os.path.join(self.tmp_dir.name, "other.zip")
+        with zipfile.ZipFile(location, "w") as archive:
+            for name, data in self.files.items():
+                archive.writestr(name, data)
+        self._check(location)
+
+    def test_compressed_zip(self) -> None:
+        """Test that compressed zip members are rejected."""
+        location = os.path.join(self.tmp_dir.name, "compressed.zip")
+        with zipfile.ZipFile(location, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("schema.json", b"{}")
+        with self.assertRaises(ValueError):
+            _clone_keyspace._DumpSource(location)
+
+
+class IncrementalTestCase(unittest.TestCase):
+    """Tests for selection of tables for incremental dump."""
+
+    def test_carried_tables(self) -> None:
+        """Test that only unchanged older time partitions are carried."""
+        base_schema = {
+            table: f"CREATE TABLE {table}"
+            for table in ("DiaObject", "DiaSource_1", "DiaSource_2", "DiaSource_3", "Forced_9", "Forced_10")
+        }
+        base_files = {table: ("base", [f"{table}.csv.gz"]) for table in base_schema}
+        schema = dict(base_schema)
+        schema["DiaSource_2"] = "CREATE TABLE DiaSource_2 (changed)"
+        schema["DiaSource_4"] = "CREATE TABLE DiaSource_4"
+        self.assertEqual(
+            _clone_keyspace._carried_tables(schema, base_schema, base_files), {"DiaSource_1", "Forced_9"}
+        )
+        # Table that has no files in base dump is dumped.
+        del base_files["DiaSource_1"]
+        self.assertEqual(_clone_keyspace._carried_tables(schema, base_schema, base_files), {"Forced_9"})
+
+    def test_newest_partitions(self) -> None:
+        """Test that partition numbers are compared as numbers."""
+        self.assertEqual(
+            _clone_keyspace._newest_partitions(["A_9", "A_10", "B_1", "C", "Long_Name_3"]),
+            {"A": 10, "B": 1, "Long_Name": 3},
+        )
+
+
+class ConcurrencyLimiterTestCase(unittest.IsolatedAsyncioTestCase):
+    """Tests for adaptive concurrency limit."""
+
+    @staticmethod
+    def _start(latency: float = 1.0) -> float:
+        """Return start time of a request that took given time."""
+        return time.monotonic() - latency
+
+    def test_fixed(self) -> None:
+        """Test that equal bounds make a fixed limit without retries."""
+        limiter = _clone_keyspace._ConcurrencyLimiter(4, 4)
+        self.assertEqual(limiter.retries, 0)
+        limiter.release(self._start(), overloaded=True)
+        limiter.release(self._start(100.0), overloaded=False)
+        self.assertEqual(limiter.limit, 4)
+
+    def test_bounds(self) -> None:
+        """Test that limit grows to the upper bound and is decreased down to
+        the lower bound.
+        """
+        limiter = _clone_keyspace._ConcurrencyLimiter(2, 5)
+        self.assertEqual(limiter.limit, 2)
+        for _ in range(100):
+            limiter.release(self._start(), overloaded=False)
+        self.assertEqual(limiter.limit, 5)
+        limiter.release(self._start(), overloaded=True)
+        self.assertEqual(limiter.limit, int(5 * _clone_keyspace._ADAPTIVE_TIMEOUT_DECREASE))
+        for _ in range(10):
+            limiter.release(time.monotonic(), overloaded=True)
+        self.assertEqual(limiter.limit, 2)
+        self.assertEqual(limiter.overloads, 11)
+
+    def test_single_signal(self) -> None:
+        """Test that requests started before a decrease do not decrease the
+        limit again.
+        """
+        limiter = _clone_keyspace._ConcurrencyLimiter(1, 16)
+        for _ in range(1000):
+            limiter.release(self._start(), overloaded=False)
+        self.assertEqual(limiter.limit, 16)
+        start = self._start()
+        limiter.release(start, overloaded=True)
+        limiter.release(start, overloaded=True)
+        self.assertEqual(limiter.limit, 8)
+
+    def test_high_latency(self) -> None:
+        """Test that latency much higher than baseline decreases the
+        limit.
+        """
+        limiter = _clone_keyspace._ConcurrencyLimiter(1, 16)
+        for _ in range(1000):
+            limiter.release(self._start(), overloaded=False)
+        limiter.release(self._start(10.0), overloaded=False)
+        self.assertEqual(limiter.limit, int(16 * _clone_keyspace._ADAPTIVE_LATENCY_DECREASE))
+
+    async def test_acquire(self) -> None:
+        """Test that acquire waits until a slot is free."""
+        limiter = _clone_keyspace._ConcurrencyLimiter(2, 2)
+        await limiter.acquire()
+        start = await limiter.acquire()
+        task = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        self.assertFalse(task.done())
+        limiter.release(start, overloaded=False)
+        await asyncio.wait_for(task, 1.0)
+        limiter.cancel()
+        await asyncio.wait_for(limiter.acquire(), 1.0)
+
+
+class TokenRangeTestCase(unittest.TestCase):
+    """Tests for splitting and sampling of the token ring."""
+
+    def test_split(self) -> None:
+        """Test that sub-ranges cover the whole range without gaps."""
+        for token_range in ((_clone_keyspace._MIN_TOKEN, _clone_keyspace._MAX_TOKEN), (-10, 10), (0, 7)):
+            for shards in (1, 3, 7):
+                ranges = _clone_keyspace._split_token_range(shards, token_range)
+                self.assertEqual(len(ranges), shards)
+                self.assertEqual(ranges[0][0], token_range[0])
+                self.assertEqual(ranges[-1][1], token_range[1])
+                for (_, end), (start, _) in zip(ranges[:-1], ranges[1:]):
+                    self.assertEqual(end, start)
+                self.assertTrue(all(start < end for start, end in ranges))
+
+    def test_split_narrow(self) -> None:
+        """Test that range with too few tokens cannot be split."""
+        self.assertEqual(_clone_keyspace._split_token_range(3, (0, 3)), [(0, 1), (1, 2), (2, 3)])
+        with self.assertRaises(ValueError):
+            _clone_keyspace._split_token_range(4, (0, 3))
+        with self.assertRaises(ValueError):
+            _clone_keyspace._split_token_range(1, (5, 5))
+
+    def test_sample(self) -> None:
+        """Test bounds of sampled range."""
+        min_token, max_token = _clone_keyspace._MIN_TOKEN, _clone_keyspace._MAX_TOKEN
+        self.assertEqual(_clone_keyspace._sample_token_range(1.0), (min_token, max_token))
+        start, end = _clone_keyspace._sample_token_range(0.5)
+        self.assertEqual(start, min_token)
+        self.assertAlmostEqual(end / 2**63, 0.0, places=6)
+        # Smaller sample is a subset of larger sample.
+        self.assertLess(_clone_keyspace._sample_token_range(0.01)[1], end)
+        with self.assertRaises(ValueError):
+            _clone_keyspace._sample_token_range(1e-30)
+
+
+if __name__ == "__main__":
+    unittest.main()